@@ -1,6 +1,7 @@
 import math
 import numpy as np
 from OpenGL.GL import *
+from shape import Shape
 
 # Constantes de layout (devem corresponder aos shaders)
 ATTRIB_LOC_POSITION = 0
@@ -9,8 +10,12 @@ ATTRIB_LOC_TEXCOORD = 3
 
 TWO_PI = 2.0 * math.pi
 
-class Cylinder:
+class Cylinder(Shape):
     def __init__(self, nstack = 32, nslice=32):
+        # cilindros com a mesma tesselagem compartilham os buffers
+        self.Share((Cylinder, nstack, nslice), lambda: self.Build(nstack, nslice))
+
+    def Build(self, nstack, nslice):
         self.m_vao = glGenVertexArrays(1)
         self.m_vbos = glGenBuffers(3)
         self.m_ebo = glGenBuffers(1)
@@ -115,10 +120,11 @@ class Cylinder:
         glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
         glBindBuffer(GL_ARRAY_BUFFER, 0)
 
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.m_vao])
-        glDeleteBuffers(3, self.m_vbos)
-        glDeleteBuffers(1, [self.m_ebo])
+    @staticmethod
+    def DeleteBuffers(attrs):
+        glDeleteVertexArrays(1, [attrs["m_vao"]])
+        glDeleteBuffers(3, attrs["m_vbos"])
+        glDeleteBuffers(1, [attrs["m_ebo"]])
 
     def Draw(self, st):
       # Desabilitar culling temporariamente para este cilindro devido ao winding order do Grid
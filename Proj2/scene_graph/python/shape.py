@@ -1,2 +1,30 @@
+from OpenGL.GL import *
+from geometryregistry import registry
+
 class Shape:
-  pass
\ No newline at end of file
+  key = None        # registry key, if the buffers are shared
+
+  def Share (self, key, build):
+    # adopt the buffers registered under 'key', calling 'build' to create
+    # them (setting this shape's attributes) the first time
+    def create ():
+      build()
+      return dict(vars(self))
+    self.__dict__.update(registry.Acquire(key,create,type(self).DeleteBuffers))
+    self.key = key
+
+  def Release (self):
+    # drop this shape's reference to shared buffers
+    if self.key is not None:
+      key, self.key = self.key, None
+      registry.Release(key)
+
+  def __del__ (self):
+    self.Release()
+
+  @staticmethod
+  def DeleteBuffers (attrs):
+    # delete the buffers described by the attributes of a shared shape
+    if attrs.get("vao"):
+      glDeleteVertexArrays(1,[attrs["vao"]])
+      glDeleteBuffers(len(attrs["buffers"]),attrs["buffers"])
@@ -6,6 +6,10 @@ import math
 
 class Sphere(Shape):
   def __init__(self, nstack=64, nslice=64):
+    # spheres with the same tessellation share their buffers
+    self.Share((Sphere,nstack,nslice),lambda: self.Build(nstack,nslice))
+
+  def Build (self, nstack, nslice):
     grid = Grid(nstack,nslice)
     self.nind = grid.IndexCount()
     coord = np.empty(3*grid.VertexCount(), dtype = 'float32')
@@ -28,6 +32,7 @@ class Sphere(Shape):
     glBindVertexArray(self.vao)
     # create coord buffer
     id = glGenBuffers(4)
+    self.buffers = id
     glBindBuffer(GL_ARRAY_BUFFER,id[0])
     glBufferData(GL_ARRAY_BUFFER,coord.nbytes,coord,GL_STATIC_DRAW)
     glVertexAttribPointer(0,3,GL_FLOAT,GL_FALSE,0,None)
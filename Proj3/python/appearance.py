@@ -1,3 +1,11 @@
 class Appearance:
   def Unload (self, st):
-    pass
\ No newline at end of file
+    pass
+
+  def IsBlended (self):
+    # blended appearances must be drawn after opaque ones, in author order
+    return False
+
+  def TransformsGeometry (self):
+    # true if the geometry is drawn away from its own bounds
+    return False
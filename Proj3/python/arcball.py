@@ -9,12 +9,19 @@ class Arcball:
     self.x0 = 0
     self.y0 = 0
     self.mat = glm.mat4(1)
+    self.version = 0
+    self.viewport = None
+  def SetViewport (self, width, height):
+    self.viewport = (width,height)
+  def GetVersion (self):
+    return self.version
   def Attach (self, win):
     def cursorpos (win, x, y):
       wn_w, wn_h = glfw.get_window_size(win)
       fb_w, fb_h = glfw.get_framebuffer_size(win)
       x = x * fb_w / wn_w
       y = (wn_h - y) * fb_h / wn_h
+      self.viewport = (fb_w,fb_h)
       self.AccumulateMouseMotion(x,y)
     def cursorinit (win, x, y):
       wn_w, wn_h = glfw.get_window_size(win)
@@ -37,11 +44,14 @@ class Arcball:
     self.y0 = y0
 
   def AccumulateMouseMotion (self, x, y):
-    vp = glGetIntegerv(GL_VIEWPORT)  
     if x==self.x0 and y==self.y0:
       return
-    ux, uy, uz = Map(vp[2],vp[3],self.x0,self.y0)
-    vx, vy, vz = Map(vp[2],vp[3],x,y)
+    if not self.viewport:
+      vp = glGetIntegerv(GL_VIEWPORT)  # queried once, if never notified
+      self.viewport = (vp[2],vp[3])
+    w, h = self.viewport
+    ux, uy, uz = Map(w,h,self.x0,self.y0)
+    vx, vy, vz = Map(w,h,x,y)
     self.x0 = x
     self.y0 = y
     ax = uy*vz - uz*vy
@@ -54,6 +64,7 @@ class Arcball:
     m = glm.rotate(m,theta,glm.vec3(ax,ay,az))
     m = glm.translate(m,glm.vec3(0,0,self.distance))
     self.mat = m * self.mat
+    self.version += 1
 
   def GetMatrix (self):
     return self.mat
@@ -62,6 +73,7 @@ class Arcball:
     m = glm.mat4(1)
     m = glm.translate(m,glm.vec3(dx*self.distance,dy*self.distance,dz*self.distance))
     self.mat = m * self.mat
+    self.version += 1
 
 # Map function: from screen (x,y) to unit sphere (px,py,pz)
 def Map (width, height, x, y):
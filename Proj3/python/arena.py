@@ -0,0 +1,225 @@
+from OpenGL.GL import *
+import numpy as np
+import ctypes
+
+from vertexlayout import STANDARD_LAYOUT
+
+# Suballocates the vertices and indices of many shapes from one vertex
+# buffer (packed with the given VertexLayout) and one index buffer, shared
+# by a single VAO. Ranges are drawn with glDrawElementsBaseVertex, so their
+# indices stay relative to their first vertex and ranges can be moved by
+# Compact. An unpacked float copy of the vertices and a copy of the
+# indices are kept to grow, compact and bake them.
+class GeometryArena:
+  def __init__ (self, layout=STANDARD_LAYOUT, vertex_capacity=1<<16, index_capacity=1<<18):
+    self.layout = layout
+    self.stride = layout.GetComponentCount()   # floats per unpacked vertex
+    self.vertices = np.zeros((vertex_capacity,self.stride),dtype='float32')
+    self.indices = np.zeros(index_capacity,dtype='uint32')
+    self.vfree = [(0,vertex_capacity)]   # sorted (offset, size) free blocks
+    self.ifree = [(0,index_capacity)]
+    self.ranges = []
+    self.version = 0   # bumped when Compact moves ranges
+    self.vao = glGenVertexArrays(1)
+    self.vbo, self.ebo = glGenBuffers(2)
+    glBindBuffer(GL_ARRAY_BUFFER,self.vbo)
+    glBufferData(GL_ARRAY_BUFFER,vertex_capacity*layout.GetStride(),None,GL_STATIC_DRAW)
+    glBindVertexArray(self.vao)
+    self.BindAttributes()
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER,self.indices.nbytes,None,GL_STATIC_DRAW)
+    glBindVertexArray(0)
+
+  def BindAttributes (self):
+    # set up the arena buffers in the currently bound VAO
+    glBindBuffer(GL_ARRAY_BUFFER,self.vbo)
+    self.layout.BindAttributes()
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER,self.ebo)
+
+  def GetVAO (self):
+    return self.vao
+
+  def GetVersion (self):
+    return self.version
+
+  def GetColumn (self, loc):
+    # first float of attribute 'loc' within an unpacked vertex, or None
+    return self.layout.GetColumn(loc)
+
+  def Allocate (self, attribs, indices):
+    # attribs: location -> flat or (n,k) array; missing ones are zero
+    return self.AllocateInterleaved(self.layout.Interleave(attribs),indices)
+
+  def AllocateInterleaved (self, data, indices):
+    # data: (n,stride) unpacked vertices in the arena layout
+    data = np.ascontiguousarray(data,dtype='float32')
+    indices = np.asarray(indices,dtype='uint32').ravel()
+    nvert = len(data)
+    voff = self.AllocVertices(nvert)
+    ioff = self.AllocIndices(len(indices))
+    self.vertices[voff:voff+nvert] = data
+    self.indices[ioff:ioff+len(indices)] = indices
+    packed = self.layout.Pack(data)
+    glBindBuffer(GL_ARRAY_BUFFER,self.vbo)
+    glBufferSubData(GL_ARRAY_BUFFER,voff*self.layout.GetStride(),packed.nbytes,packed)
+    glBindBuffer(GL_ARRAY_BUFFER,0)
+    # the element buffer binding belongs to the VAO
+    glBindVertexArray(self.vao)
+    glBufferSubData(GL_ELEMENT_ARRAY_BUFFER,ioff*4,indices.nbytes,indices)
+    glBindVertexArray(0)
+    rng = GeometryRange(self,voff,nvert,ioff,len(indices))
+    self.ranges.append(rng)
+    return rng
+
+  def AllocVertices (self, n):
+    off = AllocBlock(self.vfree,n)
+    if off is None:
+      self.GrowVertices(n)
+      off = AllocBlock(self.vfree,n)
+    return off
+
+  def AllocIndices (self, n):
+    off = AllocBlock(self.ifree,n)
+    if off is None:
+      self.GrowIndices(n)
+      off = AllocBlock(self.ifree,n)
+    return off
+
+  def GrowVertices (self, n):
+    cap = len(self.vertices)
+    newcap = max(2*cap,cap+n)
+    self.vertices = np.vstack([self.vertices,np.zeros((newcap-cap,self.stride),dtype='float32')])
+    FreeBlock(self.vfree,cap,newcap-cap)
+    packed = self.layout.Pack(self.vertices)
+    glBindBuffer(GL_ARRAY_BUFFER,self.vbo)
+    glBufferData(GL_ARRAY_BUFFER,packed.nbytes,packed,GL_STATIC_DRAW)
+    glBindBuffer(GL_ARRAY_BUFFER,0)
+
+  def GrowIndices (self, n):
+    cap = len(self.indices)
+    newcap = max(2*cap,cap+n)
+    self.indices = np.concatenate([self.indices,np.zeros(newcap-cap,dtype='uint32')])
+    FreeBlock(self.ifree,cap,newcap-cap)
+    glBindVertexArray(self.vao)
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER,self.indices.nbytes,self.indices,GL_STATIC_DRAW)
+    glBindVertexArray(0)
+
+  def Free (self, rng):
+    self.ranges.remove(rng)
+    FreeBlock(self.vfree,rng.voffset,rng.vcount)
+    FreeBlock(self.ifree,rng.ioffset,rng.icount)
+    rng.arena = None
+
+  def Compact (self):
+    # move all live ranges to the start of the buffers, in order
+    voff = 0
+    for rng in sorted(self.ranges,key=lambda r: r.voffset):
+      self.vertices[voff:voff+rng.vcount] = self.vertices[rng.voffset:rng.voffset+rng.vcount]
+      rng.voffset = voff
+      voff += rng.vcount
+    ioff = 0
+    for rng in sorted(self.ranges,key=lambda r: r.ioffset):
+      self.indices[ioff:ioff+rng.icount] = self.indices[rng.ioffset:rng.ioffset+rng.icount]
+      rng.ioffset = ioff
+      ioff += rng.icount
+    self.vfree = [(voff,len(self.vertices)-voff)] if voff < len(self.vertices) else []
+    self.ifree = [(ioff,len(self.indices)-ioff)] if ioff < len(self.indices) else []
+    packed = self.layout.Pack(self.vertices[:voff])
+    glBindBuffer(GL_ARRAY_BUFFER,self.vbo)
+    glBufferSubData(GL_ARRAY_BUFFER,0,packed.nbytes,packed)
+    glBindBuffer(GL_ARRAY_BUFFER,0)
+    glBindVertexArray(self.vao)
+    glBufferSubData(GL_ELEMENT_ARRAY_BUFFER,0,ioff*4,self.indices[:ioff])
+    glBindVertexArray(0)
+    self.version += 1
+
+  def GetFragmentation (self):
+    # 0 when all free space is one block, close to 1 when it is scattered
+    return {"vertices": Fragmentation(self.vfree),"indices": Fragmentation(self.ifree)}
+
+  def GetUsage (self):
+    return {
+      "ranges": len(self.ranges),
+      "vertices": sum(r.vcount for r in self.ranges),
+      "vertex_capacity": len(self.vertices),
+      "vertex_bytes": sum(r.vcount for r in self.ranges)*self.layout.GetStride(),
+      "indices": sum(r.icount for r in self.ranges),
+      "index_capacity": len(self.indices),
+    }
+
+class GeometryRange:
+  def __init__ (self, arena, voffset, vcount, ioffset, icount):
+    self.arena = arena
+    self.voffset = voffset   # base vertex
+    self.vcount = vcount
+    self.ioffset = ioffset   # first index
+    self.icount = icount
+
+  def GetArena (self):
+    return self.arena
+
+  def GetIndexCount (self):
+    return self.icount
+
+  def GetVertices (self):
+    # interleaved copy kept by the arena
+    return self.arena.vertices[self.voffset:self.voffset+self.vcount]
+
+  def GetIndices (self):
+    # relative to the first vertex of the range
+    return self.arena.indices[self.ioffset:self.ioffset+self.icount]
+
+  def Draw (self):
+    glBindVertexArray(self.arena.vao)
+    glDrawElementsBaseVertex(GL_TRIANGLES,self.icount,GL_UNSIGNED_INT,
+                             ctypes.c_void_p(4*self.ioffset),self.voffset)
+
+  def DrawInstanced (self, instances):
+    glBindVertexArray(self.arena.vao)
+    instances.Attach()
+    glDrawElementsInstancedBaseVertex(GL_TRIANGLES,self.icount,GL_UNSIGNED_INT,
+                                      ctypes.c_void_p(4*self.ioffset),
+                                      instances.GetCount(),self.voffset)
+    instances.Detach()
+
+  def Free (self):
+    self.arena.Free(self)
+
+# first-fit allocation in a sorted free list
+def AllocBlock (free, size):
+  for i, (off, n) in enumerate(free):
+    if n >= size:
+      if n == size:
+        del free[i]
+      else:
+        free[i] = (off+size,n-size)
+      return off
+  return None
+
+# return a block to a sorted free list, merging it with its neighbours
+def FreeBlock (free, offset, size):
+  if size == 0:
+    return
+  i = 0
+  while i < len(free) and free[i][0] < offset:
+    i += 1
+  free.insert(i,(offset,size))
+  if i+1 < len(free) and free[i][0] + free[i][1] == free[i+1][0]:
+    free[i] = (free[i][0],free[i][1]+free[i+1][1])
+    del free[i+1]
+  if i > 0 and free[i-1][0] + free[i-1][1] == free[i][0]:
+    free[i-1] = (free[i-1][0],free[i-1][1]+free[i][1])
+    del free[i]
+
+def Fragmentation (free):
+  total = sum(n for off, n in free)
+  if total == 0:
+    return 0.0
+  return 1.0 - max(n for off, n in free) / total
+
+# one shared arena per vertex layout
+arenas = {}
+
+def GetArena (layout=STANDARD_LAYOUT):
+  if layout not in arenas:
+    arenas[layout] = GeometryArena(layout)
+  return arenas[layout]
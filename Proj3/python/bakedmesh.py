@@ -0,0 +1,51 @@
+from shape import Shape
+from bounds import Bounds
+import numpy as np
+
+# Static geometry of several shapes, transformed to world space on the CPU
+# and merged into one range of an arena, so it is drawn with a single call
+# and an identity model matrix.
+class BakedMesh (Shape):
+  def __init__ (self, arena, parts):
+    # parts: (world matrix, GeometryRange) pairs, ranges in 'arena'
+    verts = np.concatenate([geom.GetVertices() for mat, geom in parts])
+    vcounts = np.array([geom.vcount for mat, geom in parts])
+    icounts = np.array([geom.icount for mat, geom in parts])
+    mats = np.array([np.array(mat,dtype='float32') for mat, geom in parts])
+    part = np.repeat(np.arange(len(parts)),vcounts)
+    rot = mats[:,:3,:3]
+    rot_v = rot[part]
+    c = arena.GetColumn(0)
+    verts[:,c:c+3] = np.einsum('nij,nj->ni',rot_v,verts[:,c:c+3]) + mats[part,:3,3]
+    c = arena.GetColumn(1)
+    if c is not None:
+      # normals by the inverse transpose
+      nrm = np.linalg.inv(rot).transpose(0,2,1)[part]
+      verts[:,c:c+3] = Normalize(np.einsum('nij,nj->ni',nrm,verts[:,c:c+3]))
+    c = arena.GetColumn(2)
+    if c is not None:
+      verts[:,c:c+3] = Normalize(np.einsum('nij,nj->ni',rot_v,verts[:,c:c+3]))
+    base = np.concatenate([[0],np.cumsum(vcounts)[:-1]])
+    indices = np.concatenate([geom.GetIndices() for mat, geom in parts])
+    indices = indices + np.repeat(base,icounts).astype('uint32')
+    c = arena.GetColumn(0)
+    self.bounds = Bounds(verts[:,c:c+3])
+    self.nind = len(indices)
+    self.geometry = arena.AllocateInterleaved(verts,indices)
+
+  def GetTriangleCount (self):
+    return self.nind // 3
+
+  def Draw (self, st):
+    self.geometry.Draw()
+
+  def Release (self):
+    # return the merged range to the arena
+    if self.geometry:
+      self.geometry.Free()
+      self.geometry = None
+
+def Normalize (v):
+  n = np.linalg.norm(v,axis=1,keepdims=True)
+  n[n == 0] = 1
+  return v / n
@@ -0,0 +1,39 @@
+# construction time of the procedural shapes versus tessellation level;
+# only the CPU side is timed (no GL context needed)
+import sys
+import time
+
+from grid import Grid
+from sphere import SphereGeometry
+from cylinder import CylinderGeometry
+
+LEVELS = (8, 16, 32, 64, 128, 256, 512, 1024)
+
+def Measure (func, repeat=5):
+  best = None
+  for _ in range(repeat):
+    t0 = time.perf_counter()
+    func()
+    t = time.perf_counter() - t0
+    best = t if best is None else min(best,t)
+  return best
+
+def BuildGrid (n):
+  return Grid(n,n)
+
+def BuildSphere (n):
+  return SphereGeometry(Grid(n,n).GetCoords())
+
+def BuildCylinder (n):
+  return CylinderGeometry(n,n)
+
+def main ():
+  levels = [int(arg) for arg in sys.argv[1:]] or LEVELS
+  shapes = (("grid",BuildGrid),("sphere",BuildSphere),("cylinder",BuildCylinder))
+  print("%8s %10s" % ("level","triangles") + "".join("%12s" % name for name, _ in shapes))
+  for n in levels:
+    times = [Measure(lambda: build(n)) for _, build in shapes]
+    print("%8d %10d" % (n,2*n*n) + "".join("%10.3fms" % (1000*t) for t in times))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,51 @@
+import numpy as np
+
+class Bounds:
+  def __init__ (self, coords, dim=3):
+    # coords: flat or (n,dim) array of vertex positions
+    pts = np.asarray(coords,dtype='float32').reshape(-1,dim)
+    if dim < 3:
+      pts = np.hstack([pts,np.zeros((len(pts),3-dim),dtype='float32')])
+    self.min = pts.min(axis=0)
+    self.max = pts.max(axis=0)
+    self.center = (self.min + self.max) / 2
+    self.radius = float(np.sqrt(((pts - self.center)**2).sum(axis=1).max()))
+
+  def GetMin (self):
+    return self.min
+
+  def GetMax (self):
+    return self.max
+
+  def GetCenter (self):
+    return self.center
+
+  def GetRadius (self):
+    return self.radius
+
+# box enclosing a list of bounds, as (min, max) arrays
+def UnionBounds (blist):
+  bmin = np.min([b.GetMin() for b in blist],axis=0)
+  bmax = np.max([b.GetMax() for b in blist],axis=0)
+  return bmin, bmax
+
+# world-space boxes of local boxes (n,3) under matrices (n,4,4)
+def TransformBoxes (mats, bmin, bmax):
+  center = (bmin + bmax) / 2
+  extent = (bmax - bmin) / 2
+  rot = mats[:,:3,:3]
+  wcenter = np.einsum('nij,nj->ni',rot,center) + mats[:,:3,3]
+  wextent = np.einsum('nij,nj->ni',np.abs(rot),extent)
+  return wcenter - wextent, wcenter + wextent
+
+# the six clip planes (a,b,c,d) of a projection * view matrix
+def FrustumPlanes (vp):
+  m = np.asarray(vp,dtype='float64')  # row-major
+  return np.array([m[3]+m[0],m[3]-m[0],m[3]+m[1],m[3]-m[1],m[3]+m[2],m[3]-m[2]])
+
+# true for boxes that are not completely outside one of the planes
+def BoxesInFrustum (planes, bmin, bmax):
+  center = (bmin + bmax) / 2
+  extent = (bmax - bmin) / 2
+  dist = center @ planes[:,:3].T + planes[:,3] + extent @ np.abs(planes[:,:3]).T
+  return (dist >= 0).all(axis=1)
@@ -1,6 +1,20 @@
 import glm
+from OpenGL.GL import *
 
 class Camera:
+  def __init__ (self):
+    self.viewport = None
+
+  def SetViewport (self, width, height):
+    # to be called from the framebuffer size callback
+    self.viewport = (width,height)
+
+  def GetViewport (self):
+    if not self.viewport:
+      vp = glGetIntegerv(GL_VIEWPORT)  # queried once, if never notified
+      self.viewport = (vp[2],vp[3])
+    return self.viewport
+
   def GetProjMatrix (self):
     return glm.mat4(1)
 
@@ -8,4 +22,4 @@ class Camera:
     return glm.mat4(1)
 
   def Load (self, st):
-    pass
\ No newline at end of file
+    pass
@@ -4,15 +4,19 @@ from camera import *
 
 class Camera2D (Camera):
   def __init__(self, xmin=-1, xmax=1, ymin=-1, ymax=1):
+    Camera.__init__(self)
+    self.proj = None
+    self.proj_key = None
     self.xmin = xmin
     self.xmax = xmax
     self.ymin = ymin
     self.ymax = ymax
 
   def GetProjMatrix (self):
-    vp = glGetInteger(GL_VIEWPORT)
-    w = vp[2]
-    h = vp[3]
+    w, h = self.GetViewport()
+    key = (w,h,self.xmin,self.xmax,self.ymin,self.ymax)
+    if key == self.proj_key:
+      return self.proj
     dx = self.xmax - self.xmin
     dy = self.ymax - self.ymin
     if w/h > dx/dy:
@@ -27,7 +31,9 @@ class Camera2D (Camera):
       ymax = yc + dy/2 * h/w
       xmin = self.xmin
       xmax = self.xmax
-    return glm.ortho(xmin,xmax,ymin,ymax)
+    self.proj = glm.ortho(xmin,xmax,ymin,ymax)
+    self.proj_key = key
+    return self.proj
 
   def GetViewMatrix (self):
     return glm.mat4(1.0)
\ No newline at end of file
@@ -5,6 +5,7 @@ from camera import *
 
 class Camera3D (Camera):
   def __init__(self, x, y, z):
+    Camera.__init__(self)
     self.ortho = False
     self.fovy = 45
     self.znear = 0.1
@@ -14,9 +15,18 @@ class Camera3D (Camera):
     self.up = glm.vec3(0,1,0)
     self.arcball = None
     self.reference = None
+    self.version = 0      # incremented whenever a parameter changes
+    self.proj = None
+    self.proj_key = None
+    self.view = None
+    self.view_key = None
+
+  def Touch (self):
+    self.version += 1
 
   def SetAngle (self, fovy):
     self.fovy = fovy
+    self.Touch()
 
   def GetAngle (self):
     return self.fovy
@@ -24,29 +34,36 @@ class Camera3D (Camera):
   def SetZPlanes (self, znear, zfar):
     self.znear = znear
     self.zfar = zfar
+    self.Touch()
   
   def SetCenter (self, x, y, z):
     self.center = glm.vec3(x,y,z)
+    self.Touch()
 
   def GetCenter (self):
     return self.center
 
   def SetEye (self, x, y, z):
     self.eye = glm.vec3(x,y,z)
+    self.Touch()
 
   def GetEye (self):
     return self.eye
 
   def SetUpDir (self, x, y, z):
     self.up = glm.vec3(x,y,z)
+    self.Touch()
 
   def SetOrtho (self, flag):
     self.ortho = flag
+    self.Touch()
 
   def CreateArcball (self):
     from arcball import Arcball
     d = glm.length(self.eye-self.center)
     self.arcball = Arcball(d)
+    if self.viewport:
+      self.arcball.SetViewport(*self.viewport)
     return self.arcball
 
   def GetArcball (self):
@@ -54,25 +71,47 @@ class Camera3D (Camera):
 
   def SetReference (self, ref):
     self.reference = ref
+    self.Touch()
+
+  def SetViewport (self, width, height):
+    Camera.SetViewport(self,width,height)
+    if self.arcball:
+      self.arcball.SetViewport(width,height)
 
   def GetProjMatrix (self):
-    vp = glGetIntegerv(GL_VIEWPORT)
-    ratio = vp[2]/vp[3]
+    w, h = self.GetViewport()
+    key = (self.version,w,h)
+    if key == self.proj_key:
+      return self.proj
+    ratio = w/h
     if not self.ortho:
-      return glm.perspective(glm.radians(self.fovy),ratio,self.znear,self.zfar)
+      self.proj = glm.perspective(glm.radians(self.fovy),ratio,self.znear,self.zfar)
     else:
       dist = glm.distance(self.eye,self.center)
       height = dist * math.tan(glm.radians(self.fovy)/2)
-      width = height / vp[3] * vp[2]
-      return glm.ortho(-width,width,-height,height,self.znear,self.zfar)
+      width = height / h * w
+      self.proj = glm.ortho(-width,width,-height,height,self.znear,self.zfar)
+    self.proj_key = key
+    return self.proj
 
   def GetViewMatrix (self):
+    if self.reference:
+      refmat = self.reference.GetModelMatrix()
+      key = (self.version,self.reference.stamp)
+    else:
+      key = (self.version,None)
+    if self.arcball:
+      key = key + (self.arcball.GetVersion(),)
+    if key == self.view_key:
+      return self.view
     view = glm.mat4(1.0)
     if self.arcball: 
       view = view * self.arcball.GetMatrix()
     view = view * glm.lookAt(self.eye,self.center,self.up)
     if (self.reference):
-        view = view * glm.inverse(self.reference.GetModelMatrix())
+        view = view * glm.inverse(refmat)
+    self.view = view
+    self.view_key = key
     return view
 
   def Load (self, st):
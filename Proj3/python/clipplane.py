@@ -24,8 +24,13 @@ class ClipPlane(Appearance):
       Mit = glm.transpose(glm.inverse(M))
       # transform planes
       planes = []
+      gs = st.GetRenderState()
+      gs.Push()
       for i, p in enumerate(self.planes):
         planes.append(Mit*p)
-        glEnable(GL_CLIP_DISTANCE0 + i)
+        gs.Enable(GL_CLIP_DISTANCE0 + i)
       shd.SetUniform(self.name,planes)
       shd.SetUniform(self.planecolor,self.color)
+
+    def Unload (self, st):
+      st.GetRenderState().Pop()
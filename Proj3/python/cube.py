@@ -1,9 +1,15 @@
 from OpenGL.GL import *
 from shape import Shape
+from bounds import Bounds
+from vertexlayout import UNIT_LAYOUT
 import numpy as np
 
 class Cube (Shape):
-  def __init__ (self):
+  def __init__ (self, arena=None):
+    # all cubes share their buffers
+    self.Share((Cube,arena),lambda: self.Build(arena))
+
+  def Build (self, arena):
     coords = np.array([
       # back face: counter clockwise 
       -0.5, 0.0,-0.5,
@@ -140,34 +146,31 @@ class Cube (Shape):
       16,17,18,16,18,19,
       20,21,22,20,22,23
     ], dtype = 'uint32')
-    # create VAO
-    self.vao = glGenVertexArrays(1)
-    glBindVertexArray(self.vao)
-    # create coord buffer
-    ids = glGenBuffers(5)
-    glBindBuffer(GL_ARRAY_BUFFER,ids[0])
-    glBufferData(GL_ARRAY_BUFFER,coords.nbytes,coords,GL_STATIC_DRAW)
-    glVertexAttribPointer(0,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(0)
-    # create normal buffer
-    glBindBuffer(GL_ARRAY_BUFFER,ids[1])
-    glBufferData(GL_ARRAY_BUFFER,normals.nbytes,normals,GL_STATIC_DRAW)
-    glVertexAttribPointer(1,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(1)
-    # create tangent buffer
-    glBindBuffer(GL_ARRAY_BUFFER,ids[2])
-    glBufferData(GL_ARRAY_BUFFER,tangents.nbytes,tangents,GL_STATIC_DRAW)
-    glVertexAttribPointer(2,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(2)
-    # create tex coord buffer
-    glBindBuffer(GL_ARRAY_BUFFER,ids[3])
-    glBufferData(GL_ARRAY_BUFFER,texcoords.nbytes,texcoords,GL_STATIC_DRAW)
-    glVertexAttribPointer(3,2,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(3)
-    # create index buffer
-    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER,ids[4])
-    glBufferData(GL_ELEMENT_ARRAY_BUFFER,index.nbytes,index,GL_STATIC_DRAW)
+    self.bounds = Bounds(coords)
+    if arena:
+      self.geometry = arena.Allocate({0:coords,1:normals,2:tangents,3:texcoords},index)
+      return
+    self.vao, self.buffers, self.itype = UNIT_LAYOUT.Upload(
+      {0:coords,1:normals,2:tangents,3:texcoords},index)
+
+  def GetTriangleCount (self):
+    return 12
 
   def Draw (self, st):
+    if self.geometry:
+      self.geometry.Draw()
+      return
+    glBindVertexArray(self.vao)
+    glDrawElements(GL_TRIANGLES,36,self.itype,None)
+
+  def IsInstanceable (self):
+    return True
+
+  def DrawInstanced (self, st, instances):
+    if self.geometry:
+      self.geometry.DrawInstanced(instances)
+      return
     glBindVertexArray(self.vao)
-    glDrawElements(GL_TRIANGLES,36,GL_UNSIGNED_INT,None)
\ No newline at end of file
+    instances.Attach()
+    glDrawElementsInstanced(GL_TRIANGLES,36,self.itype,None,instances.GetCount())
+    instances.Detach()
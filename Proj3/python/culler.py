@@ -0,0 +1,85 @@
+import numpy as np
+import glm
+from bounds import *
+
+# Hierarchical frustum culling over the nodes of a compiled scene.
+# Nodes are stored in pre-order; each level holds the indices of the
+# nodes at the same depth, so the tests run vectorized per level.
+class Culler:
+  def __init__ (self, nodes, unbounded):
+    n = len(nodes)
+    self.nodes = nodes
+    index = {id(node): i for i, node in enumerate(nodes)}
+    self.parent = np.full(n,-1,dtype='int64')
+    depth = np.zeros(n,dtype='int64')
+    for i, node in enumerate(nodes):
+      if i > 0 and node.GetParent() is not None and id(node.GetParent()) in index:
+        self.parent[i] = index[id(node.GetParent())]
+        depth[i] = depth[self.parent[i]] + 1
+    self.levels = [np.nonzero(depth == d)[0] for d in range(0,depth.max()+1 if n else 0)]
+    # local boxes of the node's own shapes: empty if it has none,
+    # infinite if any of them cannot be bounded
+    self.lmin = np.full((n,3),np.inf,dtype='float64')
+    self.lmax = np.full((n,3),-np.inf,dtype='float64')
+    self.unbounded = np.zeros(n,dtype=bool)
+    for i, node in enumerate(nodes):
+      if not node.shps:
+        continue
+      blist = [shp.GetBounds() for shp in node.shps]
+      if unbounded[i] or any(b is None for b in blist):
+        self.unbounded[i] = True
+      else:
+        self.lmin[i], self.lmax[i] = UnionBounds(blist)
+    self.shaped = np.isfinite(self.lmin).all(axis=1)
+    self.mats = np.zeros((n,4,4),dtype='float64')
+    self.stamps = [None] * n
+    self.wmin = self.lmin.copy()
+    self.wmax = self.lmax.copy()
+    self.visible = np.ones(n,dtype=bool)
+
+  def UpdateMatrices (self):
+    # convert only the world matrices that were recomputed
+    for i, node in enumerate(self.nodes):
+      if self.stamps[i] != node.stamp:
+        self.mats[i] = np.array(node.world)
+        self.stamps[i] = node.stamp
+
+  def UpdateBounds (self):
+    self.UpdateMatrices()
+    wmin = np.full_like(self.lmin,np.inf)
+    wmax = np.full_like(self.lmax,-np.inf)
+    s = self.shaped
+    wmin[s], wmax[s] = TransformBoxes(self.mats[s],self.lmin[s],self.lmax[s])
+    wmin[self.unbounded] = -np.inf
+    wmax[self.unbounded] = np.inf
+    # aggregate children into their parents, deepest level first
+    for level in reversed(self.levels[1:]):
+      np.minimum.at(wmin,self.parent[level],wmin[level])
+      np.maximum.at(wmax,self.parent[level],wmax[level])
+    self.wmin = wmin
+    self.wmax = wmax
+
+  def GetWorldBounds (self, i):
+    return self.wmin[i], self.wmax[i]
+
+  def Cull (self, camera):
+    self.UpdateBounds()
+    vp = camera.GetProjMatrix() * camera.GetViewMatrix()
+    planes = FrustumPlanes(np.array(vp))
+    visible = np.zeros(len(self.nodes),dtype=bool)
+    infinite = np.isinf(self.wmin).any(axis=1) | np.isinf(self.wmax).any(axis=1)
+    empty = (self.wmin > self.wmax).any(axis=1)
+    for d, level in enumerate(self.levels):
+      # only test nodes whose parent subtree was accepted
+      if d > 0:
+        level = level[visible[self.parent[level]]]
+      if len(level) == 0:
+        break
+      inside = np.ones(len(level),dtype=bool)
+      finite = ~infinite[level] & ~empty[level]
+      idx = level[finite]
+      inside[finite] = BoxesInFrustum(planes,self.wmin[idx],self.wmax[idx])
+      inside[empty[level]] = False
+      visible[level] = inside
+    self.visible = visible
+    return visible
@@ -1,6 +1,9 @@
 import math
 import numpy as np
 from OpenGL.GL import *
+from shape import Shape
+from bounds import Bounds
+from vertexlayout import VertexLayout, FLOAT, SNORM10, UNORM16
 
 # Constantes de layout (devem corresponder aos shaders)
 ATTRIB_LOC_POSITION = 0
@@ -9,123 +12,132 @@ ATTRIB_LOC_TEXCOORD = 3
 
 TWO_PI = 2.0 * math.pi
 
-class Cylinder:
-    def __init__(self, nstack = 32, nslice=32):
-        self.m_vao = glGenVertexArrays(1)
-        self.m_vbos = glGenBuffers(3)
-        self.m_ebo = glGenBuffers(1)
+# posição, normal empacotada e texcoords em [0,1]
+CYLINDER_LAYOUT = VertexLayout(((ATTRIB_LOC_POSITION, 3, FLOAT),
+                                (ATTRIB_LOC_NORMAL, 3, SNORM10),
+                                (ATTRIB_LOC_TEXCOORD, 2, UNORM16)))
+
+class Cylinder(Shape):
+    def __init__(self, nstack = 32, nslice=32, arena=None):
+        # cilindros com a mesma tesselagem compartilham os buffers
+        self.Share((Cylinder, nstack, nslice, arena), lambda: self.Build(nstack, nslice, arena))
+
+    def Build(self, nstack, nslice, arena):
         self.m_nindices = 0
 
-        coords = []
-        normals = []
-        texcoords = []
-        indices = []
-
-        # --- 1. Vértices da Parede Lateral ---
-        for i in range(nstack + 1):
-            y = i / float(nstack)
-            for j in range(nslice + 1):
-                theta = TWO_PI * j / float(nslice)
-                x = math.cos(theta)
-                z = math.sin(theta)
-
-                coords.extend([x, y, z])
-                normals.extend([x, 0.0, z])
-                texcoords.extend([j / float(nslice), y])
-
-        # --- 2. Índices da Parede Lateral ---
-        vertices_per_stack = nslice + 1
-        for i in range(nstack):
-            for j in range(nslice):
-                v0 = i * vertices_per_stack + j
-                v1 = v0 + 1
-                v2 = (i + 1) * vertices_per_stack + j
-                v3 = v2 + 1
-
-                indices.extend([v0, v2, v1])
-                indices.extend([v1, v2, v3])
-
-        # --- 3. Vértices das Tampas ---
-        # Base
-        base_center_index = len(coords) // 3
-        coords.extend([0.0, 0.0, 0.0])
-        normals.extend([0.0, -1.0, 0.0])
-        texcoords.extend([0.5, 0.5])
-
-        base_start_index = base_center_index + 1
-        for j in range(nslice + 1):
-            theta = TWO_PI * j / float(nslice)
-            x = math.cos(theta)
-            z = math.sin(theta)
-            coords.extend([x, 0.0, z])
-            normals.extend([0.0, -1.0, 0.0])
-            texcoords.extend([x * 0.5 + 0.5, z * 0.5 + 0.5])
-
-        # Topo
-        top_center_index = len(coords) // 3
-        coords.extend([0.0, 1.0, 0.0])
-        normals.extend([0.0, 1.0, 0.0])
-        texcoords.extend([0.5, 0.5])
-
-        top_start_index = top_center_index + 1
-        for j in range(nslice + 1):
-            theta = TWO_PI * j / float(nslice)
-            x = math.cos(theta)
-            z = math.sin(theta)
-            coords.extend([x, 1.0, z])
-            normals.extend([0.0, 1.0, 0.0])
-            texcoords.extend([x * 0.5 + 0.5, z * 0.5 + 0.5])
-
-        # --- 4. Índices das Tampas ---
-        for j in range(nslice):
-            # Base (CW)
-            indices.extend([base_center_index, base_start_index + j, base_start_index + j + 1])
-            # Topo (CCW)
-            indices.extend([top_center_index, top_start_index + j + 1, top_start_index + j])
+        coords, normals, texcoords, indices = CylinderGeometry(nstack, nslice)
 
         # --- 5. Configuração do VAO e Buffers ---
         self.m_nindices = len(indices)
+        self.bounds = Bounds(coords)
 
-        glBindVertexArray(self.m_vao)
+        if arena:
+            self.geometry = arena.Allocate({0: coords, 1: normals, 3: texcoords}, indices)
+            return
+
+        self.m_vao, self.m_vbos, self.m_itype = CYLINDER_LAYOUT.Upload(
+            {ATTRIB_LOC_POSITION: coords, ATTRIB_LOC_NORMAL: normals, ATTRIB_LOC_TEXCOORD: texcoords}, indices)
 
-        # Buffer de Coordenadas
-        glBindBuffer(GL_ARRAY_BUFFER, self.m_vbos[0])
-        glBufferData(GL_ARRAY_BUFFER, np.array(coords, dtype=np.float32), GL_STATIC_DRAW)
-        glVertexAttribPointer(ATTRIB_LOC_POSITION, 3, GL_FLOAT, GL_FALSE, 0, None)
-        glEnableVertexAttribArray(ATTRIB_LOC_POSITION)
-
-        # Buffer de Normais
-        glBindBuffer(GL_ARRAY_BUFFER, self.m_vbos[1])
-        glBufferData(GL_ARRAY_BUFFER, np.array(normals, dtype=np.float32), GL_STATIC_DRAW)
-        glVertexAttribPointer(ATTRIB_LOC_NORMAL, 3, GL_FLOAT, GL_FALSE, 0, None)
-        glEnableVertexAttribArray(ATTRIB_LOC_NORMAL)
-
-        # Buffer de Coordenadas de Textura
-        glBindBuffer(GL_ARRAY_BUFFER, self.m_vbos[2])
-        glBufferData(GL_ARRAY_BUFFER, np.array(texcoords, dtype=np.float32), GL_STATIC_DRAW)
-        glVertexAttribPointer(ATTRIB_LOC_TEXCOORD, 2, GL_FLOAT, GL_FALSE, 0, None)
-        glEnableVertexAttribArray(ATTRIB_LOC_TEXCOORD)
-
-        # Buffer de Índices
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.m_ebo)
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, np.array(indices, dtype=np.uint32), GL_STATIC_DRAW)
-
-        # Desvincula
-        glBindVertexArray(0)
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.m_vao])
-        glDeleteBuffers(3, self.m_vbos)
-        glDeleteBuffers(1, [self.m_ebo])
+    @staticmethod
+    def DeleteBuffers(attrs):
+        if attrs.get("geometry"):
+            attrs["geometry"].Free()
+            return
+        glDeleteVertexArrays(1, [attrs["m_vao"]])
+        glDeleteBuffers(len(attrs["m_vbos"]), attrs["m_vbos"])
+
+    def GetTriangleCount(self):
+        return self.m_nindices // 3
 
     def Draw(self, st):
       # Desabilitar culling temporariamente para este cilindro devido ao winding order do Grid
-      cull_enabled = glIsEnabled(GL_CULL_FACE)
-      glDisable(GL_CULL_FACE)
-      glBindVertexArray(self.m_vao)
-      glDrawElements(GL_TRIANGLES, self.m_nindices, GL_UNSIGNED_INT, None)
+      gs = st.GetRenderState()
+      gs.Push()
+      gs.Disable(GL_CULL_FACE)
+      gs.Flush()
+      if self.geometry:
+        self.geometry.Draw()
+      else:
+        glBindVertexArray(self.m_vao)
+        glDrawElements(GL_TRIANGLES, self.m_nindices, self.m_itype, None)
       # Restaurar o estado anterior do culling
-      if cull_enabled:
-        glEnable(GL_CULL_FACE)
+      gs.Pop()
+
+    def IsBakeable(self):
+        # drawn with face culling disabled
+        return False
+
+    def IsInstanceable(self):
+        return True
+
+    def DrawInstanced(self, st, instances):
+      gs = st.GetRenderState()
+      gs.Push()
+      gs.Disable(GL_CULL_FACE)
+      gs.Flush()
+      if self.geometry:
+        self.geometry.DrawInstanced(instances)
+      else:
+        glBindVertexArray(self.m_vao)
+        instances.Attach()
+        glDrawElementsInstanced(GL_TRIANGLES, self.m_nindices, self.m_itype, None, instances.GetCount())
+        instances.Detach()
+      gs.Pop()
+
+
+def CylinderGeometry(nstack, nslice):
+    # cilindro unitário ao longo de y: parede lateral, depois base e topo
+    # --- 1. Vértices da Parede Lateral ---
+    y = np.arange(nstack + 1) / float(nstack)
+    s = np.arange(nslice + 1) / float(nslice)
+    theta = TWO_PI * np.arange(nslice + 1) / float(nslice)
+    x = np.cos(theta)
+    z = np.sin(theta)
+    zero = np.zeros(nslice + 1)
+    one = np.ones(nslice + 1)
+
+    yy, xx = np.meshgrid(y, x, indexing='ij')
+    zz = np.broadcast_to(z, xx.shape)
+    side_coords = np.stack((xx, yy, zz), axis=-1).reshape(-1, 3)
+    side_normals = np.stack((xx, np.zeros_like(xx), zz), axis=-1).reshape(-1, 3)
+    side_texcoords = np.stack((np.broadcast_to(s, xx.shape), yy), axis=-1).reshape(-1, 2)
+
+    # --- 2. Índices da Parede Lateral ---
+    vertices_per_stack = nslice + 1
+    i, j = np.meshgrid(np.arange(nstack), np.arange(nslice), indexing='ij')
+    v0 = (i * vertices_per_stack + j).reshape(-1)
+    v1 = v0 + 1
+    v2 = v0 + vertices_per_stack
+    v3 = v2 + 1
+    side_indices = np.stack((v0, v2, v1, v1, v2, v3), axis=-1).reshape(-1)
+
+    # --- 3. Vértices das Tampas ---
+    # centro seguido do anel, primeiro a base e depois o topo
+    ring_texcoords = np.stack((x * 0.5 + 0.5, z * 0.5 + 0.5), axis=-1)
+    center_texcoords = np.array([[0.5, 0.5]])
+    cap_coords = []
+    cap_normals = []
+    cap_texcoords = []
+    for h, n in ((0.0, -1.0), (1.0, 1.0)):
+        cap_coords += [[[0.0, h, 0.0]], np.stack((x, h * one, z), axis=-1)]
+        cap_normals += [np.tile([0.0, n, 0.0], (nslice + 2, 1))]
+        cap_texcoords += [center_texcoords, ring_texcoords]
+
+    # --- 4. Índices das Tampas ---
+    base_center_index = len(side_coords)
+    base_start_index = base_center_index + 1
+    top_center_index = base_start_index + nslice + 1
+    top_start_index = top_center_index + 1
+    j = np.arange(nslice)
+    cap_indices = np.stack((
+        # Base (CW)
+        np.full(nslice, base_center_index), base_start_index + j, base_start_index + j + 1,
+        # Topo (CCW)
+        np.full(nslice, top_center_index), top_start_index + j + 1, top_start_index + j
+    ), axis=-1).reshape(-1)
+
+    coords = np.concatenate([side_coords] + cap_coords).astype(np.float32).reshape(-1)
+    normals = np.concatenate([side_normals] + cap_normals).astype(np.float32).reshape(-1)
+    texcoords = np.concatenate([side_texcoords] + cap_texcoords).astype(np.float32).reshape(-1)
+    indices = np.concatenate((side_indices, cap_indices)).astype(np.uint32)
+    return coords, normals, texcoords, indices
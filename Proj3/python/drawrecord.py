@@ -0,0 +1,28 @@
+class DrawRecord:
+  def __init__ (self, node, shader, apps, shps, index=0):
+    self.node = node        # provides the cached world matrix
+    self.index = index      # position of the node in the compiled scene
+    self.shader = shader    # resolved from the closest ancestor
+    self.apps = apps        # inherited appearances, root first
+    self.shps = shps
+    self.instances = None   # InstanceBuffer, for instanced records
+    self.baked = False      # merged static geometry, already in world space
+    self.indirect = None    # IndirectBatch, for multi-draw records
+
+  def GetNode (self):
+    return self.node
+
+  def GetIndex (self):
+    return self.index
+
+  def GetShader (self):
+    return self.shader
+
+  def GetAppearances (self):
+    return self.apps
+
+  def GetShapes (self):
+    return self.shps
+
+  def GetInstances (self):
+    return self.instances
@@ -1,3 +1,12 @@
 class Engine:
   def Update (self, dt):
-    pass
\ No newline at end of file
+    pass
+
+  def GetRate (self):
+    # updates per second under a Scheduler; None uses the scheduler rate
+    return None
+
+  def Interpolate (self, alpha):
+    # called by a Scheduler before rendering, with the fraction of a step
+    # elapsed since the last update, for engines that blend their states
+    pass
@@ -0,0 +1,60 @@
+from OpenGL.GL import *
+import numpy as np
+import glm
+
+# std140 uniform block shared by the ilum_vert shaders:
+#   layout(std140) uniform FrameBlock {
+#     mat4 view; mat4 proj;              // offsets 0, 64
+#     vec4 lpos; vec4 lamb;              // offsets 128, 144
+#     vec4 ldif; vec4 lspe;              // offsets 160, 176
+#   };
+FRAME_BLOCK_NAME = "FrameBlock"
+FRAME_BLOCK_BINDING = 0
+FRAME_BLOCK_SIZE = 192
+
+def Std140 (*values):
+  return np.concatenate([np.frombuffer(v.to_bytes(),dtype='float32') for v in values])
+
+class FrameBlock:
+  def __init__ (self):
+    self.frame = 0
+    self.camera_frame = -1
+    self.light_frame = -1
+    self.light = None
+    self.view = glm.mat4(1.0)
+    self.ubo = glGenBuffers(1)
+    glBindBuffer(GL_UNIFORM_BUFFER,self.ubo)
+    glBufferData(GL_UNIFORM_BUFFER,FRAME_BLOCK_SIZE,None,GL_DYNAMIC_DRAW)
+    glBindBuffer(GL_UNIFORM_BUFFER,0)
+    glBindBufferBase(GL_UNIFORM_BUFFER,FRAME_BLOCK_BINDING,self.ubo)
+
+  def NewFrame (self):
+    # each State owns a block on the same binding point: claim it again,
+    # in case another State's block was bound since the last frame
+    self.frame += 1
+    glBindBufferBase(GL_UNIFORM_BUFFER,FRAME_BLOCK_BINDING,self.ubo)
+
+  def LoadCamera (self, camera):
+    # write view and projection once per frame
+    if self.camera_frame == self.frame:
+      return
+    self.view = camera.GetViewMatrix()
+    data = Std140(self.view,camera.GetProjMatrix())
+    glBindBuffer(GL_UNIFORM_BUFFER,self.ubo)
+    glBufferSubData(GL_UNIFORM_BUFFER,0,data.nbytes,data)
+    glBindBuffer(GL_UNIFORM_BUFFER,0)
+    self.camera_frame = self.frame
+    self.light_frame = -1   # eye-space light position depends on the view
+
+  def LoadLight (self, st, light):
+    # write light parameters once per frame (or when the light changes)
+    self.LoadCamera(st.GetCamera())
+    if self.light_frame == self.frame and self.light is light:
+      return
+    pos = light.GetPosition(st,"camera")
+    data = Std140(pos,light.amb,light.dif,light.spe)
+    glBindBuffer(GL_UNIFORM_BUFFER,self.ubo)
+    glBufferSubData(GL_UNIFORM_BUFFER,128,data.nbytes,data)
+    glBindBuffer(GL_UNIFORM_BUFFER,0)
+    self.light = light
+    self.light_frame = self.frame
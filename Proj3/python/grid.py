@@ -4,32 +4,19 @@ class Grid:
   def __init__ (self, nx, ny):
     self.nx = nx
     self.ny = ny
-    # fill coordinates
-    self.coords = np.empty(2*self.VertexCount(), dtype = 'float32')
+    # fill coordinates: j outer, i inner
     dx = 1 / nx
     dy = 1 / ny
-    nc = 0
-    for j in range(0,ny+1):
-      for i in range(0,nx+1):
-        self.coords[nc+0] = i*dx
-        self.coords[nc+1] = j*dy
-        nc += 2
-    
-    # fill indices
-    def findex (i, j, nx):
-      return j*(nx+1) + i
-
-    self.indices = np.empty(self.IndexCount(), dtype = 'uint32')
-    ni = 0
-    for j in range(0,ny):
-      for i in range(0,nx):
-        self.indices[ni+0] = findex(i,j,nx)
-        self.indices[ni+1] = findex(i+1,j,nx)
-        self.indices[ni+2] = findex(i+1,j+1,nx)
-        self.indices[ni+3] = findex(i,j,nx)
-        self.indices[ni+4] = findex(i+1,j+1,nx)
-        self.indices[ni+5] = findex(i,j+1,nx)
-        ni += 6
+    u, v = np.meshgrid(np.arange(nx+1)*dx,np.arange(ny+1)*dy)
+    self.coords = np.stack((u,v),axis=-1).astype('float32').reshape(-1)
+
+    # fill indices: two triangles per cell
+    i, j = np.meshgrid(np.arange(nx,dtype='uint32'),np.arange(ny,dtype='uint32'))
+    v0 = (j*(nx+1) + i).reshape(-1)
+    v1 = v0 + 1
+    v2 = v1 + (nx+1)
+    v3 = v0 + (nx+1)
+    self.indices = np.stack((v0,v1,v2,v0,v2,v3),axis=-1).reshape(-1)
 
   def GetNx (self):
     return self.nx
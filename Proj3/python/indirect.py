@@ -0,0 +1,165 @@
+from OpenGL.GL import *
+import numpy as np
+
+from drawrecord import DrawRecord
+from material import Material
+
+# fixed locations of the indirect shaders (vertex_indirect.glsl)
+DRAW_ID_LOC = 9          # uint drawid, per instance, equals the base instance
+DRAW_BINDING = 1         # std430 buffer of {mat4 model; uvec4 material}
+MATERIAL_BINDING = 2     # std430 buffer of {vec4 amb, dif, spe, (shi,opacity)}
+DRAW_FLOATS = 20
+MATERIAL_FLOATS = 16
+
+def IndirectSupported ():
+  # glMultiDrawElementsIndirect and shader storage buffers need GL 4.3;
+  # below it records are drawn one by one by the regular scene loop
+  major = glGetIntegerv(GL_MAJOR_VERSION)
+  minor = glGetIntegerv(GL_MINOR_VERSION)
+  return (major,minor) >= (4,3)
+
+# All shapes of a set of records, submitted with one multi-draw indirect
+# call. Each shape is one DrawElementsIndirectCommand into the shared arena;
+# its model matrix and material index live in a shader storage buffer
+# indexed by the base instance. Culled draws get an instance count of zero.
+class IndirectBatch:
+  def __init__ (self, records, arena):
+    self.arena = arena
+    self.nodes = [rec.node for rec in records]
+    self.stamps = [None] * len(records)
+    self.materials = []
+    self.ranges = []
+    drawnode = []
+    drawmat = []
+    for i, rec in enumerate(records):
+      mat = [app for app in rec.apps if isinstance(app,Material)][-1]
+      if mat not in self.materials:
+        self.materials.append(mat)
+      for shp in rec.shps:
+        self.ranges.append(shp.geometry)
+        drawnode.append(i)
+        drawmat.append(self.materials.index(mat))
+    n = len(self.ranges)
+    self.drawnode = np.array(drawnode,dtype='int64')
+    self.drawindex = np.array([rec.index for rec in records],dtype='int64')[self.drawnode]
+    self.mats = np.zeros((len(records),16),dtype='float32')
+    self.draws = np.zeros((n,DRAW_FLOATS),dtype='float32')
+    self.draws.view('uint32')[:,16] = drawmat
+    self.matchanges = None   # Material.changes when the materials were packed
+    self.commands = np.zeros((n,5),dtype='uint32')
+    self.version = None
+    self.selection = None
+    self.count = 0
+    self.cbo, self.dbo, self.mbo, self.ibo = glGenBuffers(4)
+    # own VAO on the arena buffers, plus the per-instance draw id
+    self.vao = glGenVertexArrays(1)
+    glBindVertexArray(self.vao)
+    arena.BindAttributes()
+    ids = np.arange(n,dtype='uint32')
+    glBindBuffer(GL_ARRAY_BUFFER,self.ibo)
+    glBufferData(GL_ARRAY_BUFFER,ids.nbytes,ids,GL_STATIC_DRAW)
+    glVertexAttribIPointer(DRAW_ID_LOC,1,GL_UNSIGNED_INT,0,None)
+    glEnableVertexAttribArray(DRAW_ID_LOC)
+    glVertexAttribDivisor(DRAW_ID_LOC,1)
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER,0)
+
+  def GetCount (self):
+    return self.count
+
+  def Delete (self):
+    # free the batch's buffers and VAO; the arena buffers stay
+    if self.vao:
+      glDeleteBuffers(4,[self.cbo,self.dbo,self.mbo,self.ibo])
+      glDeleteVertexArrays(1,[self.vao])
+      self.vao = None
+
+  def Update (self, visible=None):
+    # refresh changed matrices, materials and commands; returns the
+    # number of draws left after culling
+    moved = False
+    for i, node in enumerate(self.nodes):
+      if self.stamps[i] != node.stamp:
+        self.mats[i] = np.frombuffer(node.world.to_bytes(),dtype='float32')
+        self.stamps[i] = node.stamp
+        moved = True
+    if moved:
+      self.draws[:,0:16] = self.mats[self.drawnode]
+      glBindBuffer(GL_SHADER_STORAGE_BUFFER,self.dbo)
+      glBufferData(GL_SHADER_STORAGE_BUFFER,self.draws.nbytes,self.draws,GL_STREAM_DRAW)
+    if self.matchanges != Material.changes:
+      # repacked only after a material setter ran
+      self.matchanges = Material.changes
+      matdata = np.array([PackMaterial(m) for m in self.materials],dtype='float32')
+      glBindBuffer(GL_SHADER_STORAGE_BUFFER,self.mbo)
+      glBufferData(GL_SHADER_STORAGE_BUFFER,matdata.nbytes,matdata,GL_DYNAMIC_DRAW)
+    glBindBuffer(GL_SHADER_STORAGE_BUFFER,0)
+    changed = False
+    if self.version != self.arena.GetVersion():
+      # ranges moved by compaction
+      self.version = self.arena.GetVersion()
+      for i, rng in enumerate(self.ranges):
+        self.commands[i] = (rng.icount,1,rng.ioffset,rng.voffset,i)
+      self.selection = None
+      changed = True
+    sel = visible[self.drawindex] if visible is not None else None
+    if changed or not SameSelection(sel,self.selection):
+      self.selection = sel
+      self.commands[:,1] = 1 if sel is None else sel
+      self.count = int(self.commands[:,1].sum())
+      glBindBuffer(GL_DRAW_INDIRECT_BUFFER,self.cbo)
+      glBufferData(GL_DRAW_INDIRECT_BUFFER,self.commands.nbytes,self.commands,GL_STREAM_DRAW)
+      glBindBuffer(GL_DRAW_INDIRECT_BUFFER,0)
+    return self.count
+
+  def Draw (self):
+    glBindVertexArray(self.vao)
+    glBindBufferBase(GL_SHADER_STORAGE_BUFFER,DRAW_BINDING,self.dbo)
+    glBindBufferBase(GL_SHADER_STORAGE_BUFFER,MATERIAL_BINDING,self.mbo)
+    glBindBuffer(GL_DRAW_INDIRECT_BUFFER,self.cbo)
+    glMultiDrawElementsIndirect(GL_TRIANGLES,GL_UNSIGNED_INT,None,len(self.commands),0)
+    glBindBuffer(GL_DRAW_INDIRECT_BUFFER,0)
+
+def SameSelection (a, b):
+  if a is None or b is None:
+    return a is None and b is None
+  return np.array_equal(a,b)
+
+def PackMaterial (mat):
+  return tuple(mat.amb) + tuple(mat.dif) + tuple(mat.spe) + (mat.shi,mat.opacity,0.0,0.0)
+
+# records drawn with 'source' whose appearances are plain opaque materials
+# and whose shapes all live in one arena
+def CanDrawIndirect (rec, source):
+  if rec.shader is not source or rec.instances:
+    return False
+  if not rec.apps or not all(isinstance(app,Material) and not app.IsBlended() for app in rec.apps):
+    return False
+  if not all(shp.IsBakeable() for shp in rec.shps):
+    return False
+  return len(set(shp.geometry.GetArena() for shp in rec.shps)) == 1
+
+# replace the records that can be drawn indirectly by one record per arena,
+# drawn with 'shader' and placed where the first of them was
+def GroupIndirect (records, source, shader):
+  groups = {}
+  order = []
+  for rec in records:
+    if CanDrawIndirect(rec,source):
+      arena = rec.shps[0].geometry.GetArena()
+      if arena not in groups:
+        groups[arena] = []
+        order.append(arena)
+      groups[arena].append(rec)
+    else:
+      order.append(rec)
+  result = []
+  for item in order:
+    if isinstance(item,DrawRecord):
+      result.append(item)
+      continue
+    group = groups[item]
+    rec = DrawRecord(group[0].node,shader,(),(),group[0].index)
+    rec.indirect = IndirectBatch(group,item)
+    result.append(rec)
+  return result
@@ -0,0 +1,153 @@
+from OpenGL.GL import *
+import numpy as np
+import ctypes
+
+from drawrecord import DrawRecord
+from material import Material
+
+# fixed attribute locations of the instanced shaders
+INSTANCE_MATRIX_LOC = 4   # mat4 Minst, uses locations 4 to 7
+INSTANCE_COLOR_LOC = 8    # vec4 Icolor
+
+# Per-instance attribute buffers for a group of nodes drawn with one
+# instanced call. World matrices are refreshed only for nodes whose cached
+# matrix changed, and only the visible instances are uploaded.
+class InstanceBuffer:
+  def __init__ (self, nodes, indices, colors=None):
+    n = len(nodes)
+    self.nodes = nodes
+    self.indices = np.array(indices,dtype='int64')
+    self.mats = np.zeros((n,16),dtype='float32')   # column-major
+    self.stamps = [None] * n
+    self.colors = None
+    self.mbo = glGenBuffers(1)
+    self.cbo = None
+    if colors is not None:
+      self.colors = np.array(colors,dtype='float32').reshape(n,4)
+      self.cbo = glGenBuffers(1)
+    self.selection = None
+    self.count = 0
+
+  def GetCount (self):
+    return self.count
+
+  def Delete (self):
+    # free the attribute buffers; the record is no longer drawn
+    if self.mbo:
+      glDeleteBuffers(1,[self.mbo])
+      self.mbo = None
+    if self.cbo:
+      glDeleteBuffers(1,[self.cbo])
+      self.cbo = None
+
+  def Update (self, visible=None):
+    changed = False
+    for i, node in enumerate(self.nodes):
+      if self.stamps[i] != node.stamp:
+        self.mats[i] = np.frombuffer(node.world.to_bytes(),dtype='float32')
+        self.stamps[i] = node.stamp
+        changed = True
+    if visible is not None:
+      sel = visible[self.indices]
+      if self.selection is None or not np.array_equal(sel,self.selection):
+        self.selection = sel
+        changed = True
+    elif self.selection is not None:
+      self.selection = None
+      changed = True
+    if changed:
+      if self.selection is None:
+        mats, colors = self.mats, self.colors
+      else:
+        mats = self.mats[self.selection]
+        colors = self.colors[self.selection] if self.cbo else None
+      self.count = len(mats)
+      glBindBuffer(GL_ARRAY_BUFFER,self.mbo)
+      glBufferData(GL_ARRAY_BUFFER,mats.nbytes,mats,GL_STREAM_DRAW)
+      if self.cbo:
+        glBindBuffer(GL_ARRAY_BUFFER,self.cbo)
+        glBufferData(GL_ARRAY_BUFFER,colors.nbytes,colors,GL_STREAM_DRAW)
+      glBindBuffer(GL_ARRAY_BUFFER,0)
+    return self.count
+
+  def Attach (self):
+    # set the per-instance attributes on the currently bound VAO
+    glBindBuffer(GL_ARRAY_BUFFER,self.mbo)
+    for c in range(0,4):
+      loc = INSTANCE_MATRIX_LOC + c
+      glVertexAttribPointer(loc,4,GL_FLOAT,GL_FALSE,64,ctypes.c_void_p(16*c))
+      glEnableVertexAttribArray(loc)
+      glVertexAttribDivisor(loc,1)
+    if self.cbo:
+      glBindBuffer(GL_ARRAY_BUFFER,self.cbo)
+      glVertexAttribPointer(INSTANCE_COLOR_LOC,4,GL_FLOAT,GL_FALSE,0,None)
+      glEnableVertexAttribArray(INSTANCE_COLOR_LOC)
+      glVertexAttribDivisor(INSTANCE_COLOR_LOC,1)
+    glBindBuffer(GL_ARRAY_BUFFER,0)
+
+  def Detach (self):
+    # the VAO is the shape's own: turn the per-instance attributes off
+    # again, so regular draws of the shape do not read these buffers
+    for loc in range(INSTANCE_MATRIX_LOC,INSTANCE_COLOR_LOC+1):
+      glVertexAttribDivisor(loc,0)
+      glDisableVertexAttribArray(loc)
+
+def CanInstance (rec):
+  if rec.indirect or not rec.shader.SupportsInstancing():
+    return False
+  if not all(shp.IsInstanceable() for shp in rec.shps):
+    return False
+  return not any(app.TransformsGeometry() for app in rec.apps)
+
+# shapes sharing registry buffers draw the same, so they group together
+def ShapeKeys (shps):
+  return tuple(shp if shp.key is None else shp.key for shp in shps)
+
+def InstanceKey (rec):
+  if not rec.shader.HasInstanceColor():
+    return (rec.shader,rec.apps,ShapeKeys(rec.shps))
+  # colors are streamed per instance: materials only need to agree on
+  # the parameters that stay uniform
+  apps = []
+  for app in rec.apps:
+    if isinstance(app,Material):
+      apps.append((tuple(app.spe),app.shi,app.opacity))
+    else:
+      apps.append(app)
+  return (rec.shader,tuple(apps),ShapeKeys(rec.shps))
+
+def InstanceColor (rec):
+  color = (1.0,1.0,1.0,1.0)
+  for app in rec.apps:
+    if isinstance(app,Material):
+      color = tuple(app.dif)
+  return color
+
+# replace records that share shape, shader and appearances by one
+# instanced record, placed where the first of them was
+def GroupInstances (records):
+  groups = {}
+  order = []
+  for rec in records:
+    if CanInstance(rec):
+      key = InstanceKey(rec)
+      if key not in groups:
+        groups[key] = []
+        order.append(key)
+      groups[key].append(rec)
+    else:
+      order.append(rec)
+  result = []
+  for item in order:
+    if isinstance(item,DrawRecord):
+      result.append(item)
+      continue
+    group = groups[item]
+    first = group[0]
+    colors = None
+    if first.shader.HasInstanceColor():
+      colors = [InstanceColor(rec) for rec in group]
+    rec = DrawRecord(first.node,first.shader,first.apps,first.shps,first.index)
+    rec.instances = InstanceBuffer([r.node for r in group],[r.index for r in group],colors)
+    result.append(rec)
+  return result
@@ -37,18 +37,25 @@ class Light:
     def GetReference (self):
       return self.reference
 
+    def GetPosition (self, st, space):
+      # position in the given lighting space
+      mat = glm.mat4(1.0)
+      if self.space == "world" and space == "camera":
+        mat = st.GetCamera().GetViewMatrix()
+      elif self.space == "camera" and space == "world":
+        mat = glm.inverse(st.GetCamera().GetViewMatrix())
+      if self.GetReference():
+        mat = mat * self.GetReference().GetModelMatrix()
+      return mat * self.pos
+
     def Load (self, st):
       shd = st.GetShader()
+      if shd.HasFrameBlock():
+        st.GetFrameBlock().LoadLight(st,self)
+        return
       shd.SetUniform("lamb",self.amb)
       shd.SetUniform("ldif",self.dif)
       shd.SetUniform("lspe",self.spe)
       # Set position in lighting space
-      mat = glm.mat4(1.0)
-      if self.space == "world" and shd.GetLightingSpace() == "camera":
-        mat = st.GetCamera().GetViewMatrix()
-      elif self.space == "camera" and shd.GetLightingSpace() == "world":
-        mat = glm.inverse(st.GetCamera().GetViewMatrix())
-      if self.GetReference():
-        mat = mat * self.GetReference().GetModelMatrix()
-      pos = mat * self.pos  # to lighting space
+      pos = self.GetPosition(st,shd.GetLightingSpace())
       shd.SetUniform("lpos",pos)
@@ -0,0 +1,59 @@
+import glm
+from shape import Shape
+
+# Shape with several pre-built tessellation levels, finest first, e.g.
+#   LODShape([Sphere(64,64),Sphere(32,32),Sphere(16,16),Sphere(8,8)],[240,96,32])
+# Level i is used while the projected diameter of the bounding sphere, in
+# pixels, is at least thresholds[i]; the last level has no threshold.
+# The selected level is kept per instance: use one LODShape per node (the
+# level shapes themselves can be shared).
+class LODShape (Shape):
+  def __init__ (self, levels, thresholds, hysteresis=0.1):
+    if len(thresholds) != len(levels)-1:
+      raise RuntimeError("LODShape needs one threshold less than levels")
+    self.levels = levels
+    self.thresholds = list(thresholds) + [0.0]
+    self.hysteresis = hysteresis
+    self.current = 0
+    self.bounds = levels[0].GetBounds()
+
+  def GetLevel (self):
+    return self.current
+
+  def GetLevelCount (self):
+    return len(self.levels)
+
+  def GetTriangleCount (self):
+    return self.levels[0].GetTriangleCount()
+
+  def ProjectedSize (self, st):
+    # diameter in pixels of the bounding sphere under the current matrices
+    camera = st.GetCamera()
+    model = st.GetCurrentMatrix()
+    proj = camera.GetProjMatrix()
+    center = camera.GetViewMatrix() * model * glm.vec4(*self.bounds.GetCenter(),1.0)
+    scale = max(glm.length(glm.vec3(model[0])),
+                glm.length(glm.vec3(model[1])),
+                glm.length(glm.vec3(model[2])))
+    radius = self.bounds.GetRadius() * scale
+    w = proj[2][3]*center.z + proj[3][3]   # clip-space w
+    if w <= radius:
+      return float("inf")   # camera inside or at the sphere
+    height = camera.GetViewport()[1]
+    return 2 * radius * proj[1][1] * height / 2 / w
+
+  def SelectLevel (self, size):
+    # hysteresis: switch only when the size is clearly past a threshold
+    cur = self.current
+    while cur > 0 and size > self.thresholds[cur-1] * (1+self.hysteresis):
+      cur -= 1
+    while cur < len(self.levels)-1 and size < self.thresholds[cur] * (1-self.hysteresis):
+      cur += 1
+    self.current = cur
+    return cur
+
+  def Draw (self, st):
+    level = self.SelectLevel(self.ProjectedSize(st))
+    lod = st.GetStats().setdefault("lod",{})
+    lod[level] = lod.get(level,0) + 1
+    self.levels[level].Draw(st)
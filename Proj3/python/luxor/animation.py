@@ -4,13 +4,20 @@ class Animation:
     self.curr = 0
     self.moves = moves.copy()
 
-  # return true when its done
-  def Advance (self, dt, reverse=False):
+  # return true when its done; with an evaluator, the movement is only
+  # queued and applied when the evaluator updates
+  def Advance (self, dt, reverse=False, evaluator=None):
     if reverse:
       idx = (len(self.moves)-1) - self.curr 
     else:
       idx = self.curr
-    if self.moves[idx].Advance(dt,reverse):
+    move = self.moves[idx]
+    if evaluator:
+      t0, t1, done = move.Step(dt,reverse)
+      evaluator.Add(move,t0,t1)
+    else:
+      done = move.Advance(dt,reverse)
+    if done:
       self.curr += 1
       if self.curr == len(self.moves):
         self.curr = 0
@@ -0,0 +1,159 @@
+from engine import *
+from luxor.evaluator import Hermite, EulerXYZ
+import numpy as np
+import glm
+
+# Keyframed animation sampled at an absolute time: the pose of each target
+# transform is rest * T(translation(t)) * R(rotation(t)) * post, with the
+# translation and X, Y, Z Euler angles given by cubic Hermite segments
+# between keyframe times. Sampling does not depend on earlier samples, so
+# playback can seek, skip frames or take large steps at no extra cost.
+class Clip:
+  def __init__ (self, times, trfs, channels, coefs, relative=()):
+    # times: (k+1) keyframe times; channels: (target, is rotation) pairs;
+    # coefs: (k, channels, 4, 3) Hermite coefficients per segment
+    self.times = np.array(times,dtype='float64')
+    self.trfs = list(trfs)
+    self.coefs = np.array(coefs,dtype='float64')
+    self.target = np.array([tg for tg, rot in channels],dtype='int64')
+    self.rotation = np.array([rot for tg, rot in channels],dtype=bool)
+    n = len(self.trfs)
+    self.rests = np.array([np.array(trf.GetMatrix(),dtype='float64') for trf in self.trfs]).reshape(n,4,4)
+    self.posts = np.tile(np.identity(4),(n,1,1))
+    self.relative = [trf in relative for trf in self.trfs]
+
+  @staticmethod
+  def FromAnimation (anim, relative=()):
+    # one segment per movement; channels missing from a movement hold
+    # their value. The current matrices of the transforms are the rest
+    # pose; 'relative' transforms are re-anchored whenever playback starts
+    times = [0.0]
+    trfs = []
+    channels = []
+    curves = {}   # channel -> {segment: (p0,m0,p1,m1)}
+    for k, move in enumerate(anim.moves):
+      mtrfs, mcurves, mrotation = move.GetChannels()
+      for trf, curve, rot in zip(mtrfs,mcurves,mrotation):
+        if trf not in trfs:
+          trfs.append(trf)
+        key = (trfs.index(trf),rot)
+        if key not in curves:
+          channels.append(key)
+          curves[key] = {}
+        curves[key][k] = [list(v) for v in curve]
+      times.append(times[-1] + move.T)
+    nseg = len(anim.moves)
+    coefs = np.zeros((nseg,len(channels),4,3))
+    for c, key in enumerate(channels):
+      segs = curves[key]
+      keys = sorted(segs)
+      for k in range(nseg):
+        if k in segs:
+          coefs[k,c] = segs[k]
+          continue
+        prev = [j for j in keys if j < k]
+        hold = segs[prev[-1]][2] if prev else segs[keys[0]][0]
+        coefs[k,c,0] = hold
+        coefs[k,c,2] = hold
+    return Clip(times,trfs,channels,coefs,relative)
+
+  def GetDuration (self):
+    return self.times[-1]
+
+  def GetTransforms (self):
+    return self.trfs
+
+  def GetRest (self, trf):
+    return self.rests[self.trfs.index(trf)]
+
+  def SetRest (self, trf, mat):
+    self.rests[self.trfs.index(trf)] = np.array(mat,dtype='float64')
+
+  def GetPost (self, trf):
+    return self.posts[self.trfs.index(trf)]
+
+  def SetPost (self, trf, mat):
+    # matrix applied after the animated rotation, e.g. a head turn
+    self.posts[self.trfs.index(trf)] = np.array(mat,dtype='float64')
+
+  def Segment (self, t):
+    # binary search of the segment containing t, and the local parameter
+    t = min(max(t,0.0),self.times[-1])
+    k = int(np.searchsorted(self.times,t,side='right')) - 1
+    k = min(max(k,0),len(self.coefs)-1)
+    u = (t - self.times[k]) / (self.times[k+1] - self.times[k])
+    return k, u
+
+  def SampleLocal (self, t):
+    # animated part T * R of each target, (n,4,4)
+    k, u = self.Segment(t)
+    values = Hermite(self.coefs[k],np.full(len(self.target),u))
+    n = len(self.trfs)
+    trl = np.tile(np.identity(4),(n,1,1))
+    rot = np.tile(np.identity(4),(n,1,1))
+    tr = ~self.rotation
+    trl[self.target[tr],:3,3] = values[tr]
+    rot[self.target[self.rotation]] = EulerXYZ(np.radians(values[self.rotation]))
+    return trl @ rot
+
+  def Sample (self, t, palette=None):
+    local = palette.Sample(t) if palette else self.SampleLocal(t)
+    return self.rests @ local @ self.posts
+
+  def Anchor (self, t):
+    # make the relative targets continue from their current matrices
+    if not any(self.relative):
+      return
+    local = self.SampleLocal(t) @ self.posts
+    for i, trf in enumerate(self.trfs):
+      if self.relative[i]:
+        cur = np.array(trf.GetMatrix(),dtype='float64')
+        self.rests[i] = cur @ np.linalg.inv(local[i])
+
+  def Apply (self, t, palette=None):
+    mats = self.Sample(t,palette).astype('float32')
+    for trf, mat in zip(self.trfs,mats):
+      trf.SetMatrix(glm.mat4(mat))
+
+# Plays a clip forwards or backwards; each update samples the clip at the
+# current time, so any dt costs the same. With a baked Palette, sampling
+# is a frame lookup.
+class ClipPlayer (Engine):
+  def __init__ (self, clip, speed=1.0, palette=None):
+    self.clip = clip
+    self.palette = palette
+    self.speed = speed
+    self.time = 0.0
+    self.reverse = False
+    self.playing = False
+
+  def Play (self, reverse=False):
+    self.reverse = reverse
+    self.time = 0.0
+    self.playing = True
+    self.clip.Anchor(self.ClipTime())
+
+  def IsPlaying (self):
+    return self.playing
+
+  def GetTime (self):
+    return self.time
+
+  def ClipTime (self):
+    if self.reverse:
+      return self.clip.GetDuration() - self.time
+    return self.time
+
+  def Seek (self, t):
+    self.time = min(max(t,0.0),self.clip.GetDuration())
+    self.clip.Apply(self.ClipTime(),self.palette)
+
+  # return true when the clip reached its end
+  def Update (self, dt):
+    if not self.playing:
+      return False
+    self.Seek(self.time + dt*self.speed)
+    if self.time >= self.clip.GetDuration():
+      self.playing = False
+      return True
+    return False
@@ -15,3 +15,6 @@ class CubicInterpolator (Interpolator):
             (-2*t3+3*t2) * self.p1 +
             (t3-t2) * self.m1
            )
+
+  def GetHermite (self):
+    return (self.p0,self.m0,self.p1,self.m1)
@@ -0,0 +1,122 @@
+from engine import *
+from transformstore import StoredTransform
+import numpy as np
+import glm
+
+# Evaluates the queued steps of many movements at once. The channels of
+# each movement are packed into arrays of Hermite coefficients (linear
+# channels use the chord as tangents), all curves are evaluated at both
+# ends of their step in one vectorized pass, and every channel gets a
+# single delta matrix: a translation, or the X, Y and Z rotations of the
+# Euler delta composed in the order Movement.Apply rotates.
+# Add it to the scene after the engines that queue steps into it.
+class AnimationEvaluator (Engine):
+  def __init__ (self):
+    self.packs = {}     # movement -> packed channels
+    self.batches = {}   # tuple of movements -> concatenated channels
+    self.queue = []
+
+  def Add (self, move, t0, t1):
+    self.queue.append((move,t0,t1))
+
+  def Pack (self, move):
+    if move not in self.packs:
+      trfs, curves, rotation = move.GetChannels()
+      coefs = np.array([[list(v) for v in c] for c in curves],dtype='float64').reshape(-1,4,3)
+      self.packs[move] = (trfs,coefs,np.array(rotation,dtype=bool))
+    return self.packs[move]
+
+  def Batch (self, moves):
+    if moves not in self.batches:
+      packs = [self.Pack(m) for m in moves]
+      trfs = [trf for p in packs for trf in p[0]]
+      coefs = np.concatenate([p[1] for p in packs])
+      rotation = np.concatenate([p[2] for p in packs])
+      counts = np.array([len(p[0]) for p in packs])
+      # translations first, as Movement.Apply does
+      order = np.concatenate([np.nonzero(~rotation)[0],np.nonzero(rotation)[0]])
+      plan = PlanDeltas([trfs[i] for i in order])
+      self.batches[moves] = (coefs,rotation,counts,order,plan)
+    return self.batches[moves]
+
+  def Update (self, dt):
+    if not self.queue:
+      return
+    moves, t0, t1 = zip(*self.queue)
+    self.queue = []
+    coefs, rotation, counts, order, plan = self.Batch(moves)
+    if len(order) == 0:
+      return
+    t0 = np.repeat(t0,counts)
+    t1 = np.repeat(t1,counts)
+    delta = Hermite(coefs,t1) - Hermite(coefs,t0)
+    mats = np.tile(np.identity(4),(len(order),1,1))
+    mats[~rotation,:3,3] = delta[~rotation]
+    if rotation.any():
+      mats[rotation] = EulerXYZ(np.radians(delta[rotation]))
+    ApplyDeltas(plan,mats[order].astype('float32'))
+
+# evaluate the cubic Hermite curves of (n,4,3) coefficients at t (n,)
+def Hermite (coefs, t):
+  t2 = t*t
+  t3 = t*t2
+  h = np.stack([2*t3-3*t2+1,t3-2*t2+t,-2*t3+3*t2,t3-t2],axis=1)
+  return np.einsum('nk,nkj->nj',h,coefs)
+
+# rotation matrices (n,4,4) of Rx(a) * Ry(b) * Rz(c), angles in radians,
+# with the product expanded
+def EulerXYZ (angles):
+  cx, cy, cz = np.cos(angles).T
+  sx, sy, sz = np.sin(angles).T
+  mats = np.zeros((len(angles),4,4))
+  mats[:,0,0] = cy*cz
+  mats[:,0,1] = -cy*sz
+  mats[:,0,2] = sy
+  mats[:,1,0] = sx*sy*cz + cx*sz
+  mats[:,1,1] = cx*cz - sx*sy*sz
+  mats[:,1,2] = -sx*cy
+  mats[:,2,0] = sx*sz - cx*sy*cz
+  mats[:,2,1] = cx*sy*sz + sx*cz
+  mats[:,2,2] = cx*cy
+  mats[:,3,3] = 1
+  return mats
+
+# how to apply deltas to a list of transforms: transforms of a
+# TransformStore are updated with batched products, one per store and
+# round, the k-th delta of a slot going in round k so that several deltas
+# on the same transform compose in order; the others one by one, in order
+def PlanDeltas (trfs):
+  stores = {}
+  single = []
+  for i, trf in enumerate(trfs):
+    if isinstance(trf,StoredTransform):
+      stores.setdefault(trf.store,[]).append(i)
+    else:
+      single.append((i,trf))
+  batched = []
+  for store, items in stores.items():
+    items = np.array(items)
+    slots = np.array([trfs[i].GetIndex() for i in items])
+    rounds = Occurrences(slots)
+    for k in range(int(rounds.max())+1):
+      sel = rounds == k
+      batched.append((store,slots[sel],items[sel]))
+  return single, batched
+
+# for each element, how many equal elements come before it
+def Occurrences (values):
+  order = np.argsort(values,kind='stable')
+  ordered = values[order]
+  start = np.concatenate(([True],ordered[1:] != ordered[:-1]))
+  first = np.maximum.accumulate(np.where(start,np.arange(len(values)),0))
+  occ = np.empty(len(values),dtype='int64')
+  occ[order] = np.arange(len(values)) - first
+  return occ
+
+def ApplyDeltas (plan, mats):
+  single, batched = plan
+  for i, trf in single:
+    trf.MultMatrix(glm.mat4(mats[i]))
+  for store, slots, items in batched:
+    store.local[slots] = store.local[slots] @ mats[items]
+    store.Touch(slots)
@@ -1,3 +1,7 @@
 class Interpolator:
   def Interpolate (self, t):
     pass
+
+  def GetHermite (self):
+    # (p0, m0, p1, m1) of the equivalent cubic Hermite curve
+    pass
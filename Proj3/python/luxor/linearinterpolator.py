@@ -7,3 +7,7 @@ class LinearInterpolator (Interpolator):
 
   def Interpolate (self, t):
     return (1.0-t) * self.p0 + t * self.p1
+
+  def GetHermite (self):
+    # a Hermite curve with the chord as both tangents is the line
+    return (self.p0,self.p1-self.p0,self.p1,self.p1-self.p0)
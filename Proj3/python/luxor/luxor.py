@@ -5,7 +5,10 @@ from transform import *
 from luxor.luxorengine import *
 
 class Luxor:
-  def __init__ (self):
+  def __init__ (self, evaluator=None, clips=False, palette_dir=None, store=None):
+    # with a TransformStore shared by many lamps, the transforms are views
+    # into it and an AnimationEvaluator updates them with batched products
+    NewTransform = store.Create if store else Transform
     base_a = Mesh("../../luxor/base_a.msh")
     base_b = Mesh("../../luxor/base_b.msh")
     haste1 = Mesh("../../luxor/haste1.msh")
@@ -18,13 +21,13 @@ class Luxor:
     red = Material(1.0,0.0,0.0)
     white = Material(1.0,1.0,1.0)
     white.SetAmbient(1.0,1.0,1.0)
-    trf_all = Transform()
-    trf_base = Transform()
-    trf_haste1 = Transform()
-    trf_haste2 = Transform()
-    trf_haste3 = Transform()
-    trf_cupula = Transform()
-    trf_lampada = Transform()
+    trf_all = NewTransform()
+    trf_base = NewTransform()
+    trf_haste1 = NewTransform()
+    trf_haste2 = NewTransform()
+    trf_haste3 = NewTransform()
+    trf_cupula = NewTransform()
+    trf_lampada = NewTransform()
     trf_haste1.Translate(0.0,4.0,0.0)
     trf_haste2.Translate(0.0,17.15,0.0)
     trf_haste3.Translate(0.0,16.78,0.0)
@@ -46,7 +49,8 @@ class Luxor:
                                ])
                              ]
                     )
-    self.engine = LuxorEngine(trf_all,trf_base,trf_haste1,trf_haste2,trf_haste3,trf_cupula,trf_lampada)
+    self.engine = LuxorEngine(trf_all,trf_base,trf_haste1,trf_haste2,trf_haste3,trf_cupula,trf_lampada,
+                              evaluator,clips,palette_dir)
 
   def GetNode (self):
     return self.node
@@ -3,11 +3,21 @@ from luxor.linearinterpolator import *
 from luxor.cubicinterpolator import *
 from luxor.animation import *
 from luxor.movement import *
+from luxor.clip import *
+from luxor.palette import *
 import glm
 
+PALETTE_RATE = 120   # samples per second of baked clips
+
 class LuxorEngine (Engine): 
 
-  def __init__ (self, trf_all, trf_base, trf_haste1, trf_haste2, trf_haste3, trf_cupula, trf_lampada):
+  def __init__ (self, trf_all, trf_base, trf_haste1, trf_haste2, trf_haste3, trf_cupula, trf_lampada, evaluator=None, clips=False, palette_dir=None):
+    # with a shared AnimationEvaluator, steps are queued and evaluated
+    # together with those of other lamps; with clips, poses are sampled at
+    # absolute times instead of accumulated, from palettes baked at
+    # PALETTE_RATE and cached in 'palette_dir' when given
+    self.evaluator = evaluator
+    self.player = None
     self.reverse = False
     self.head_angle = 0.0
     self.status = "up"
@@ -21,6 +31,17 @@ class LuxorEngine (Engine):
     self.trf_lampada = trf_lampada
     self.CreateStandDownAnimation()
     self.CreateJumpForwardAnimation()
+    self.clips = None
+    if clips:
+      # built at the rest (up) pose; the lamp position moves with each jump
+      self.clips = {
+        self.stand_down_anim: Clip.FromAnimation(self.stand_down_anim,[trf_all]),
+        self.jump_forward_anim: Clip.FromAnimation(self.jump_forward_anim,[trf_all]),
+      }
+    self.palettes = {}
+    if clips and palette_dir:
+      for anim, clip in self.clips.items():
+        self.palettes[anim] = Palette.Load(clip,PALETTE_RATE,palette_dir)
 
   def CreateStandDownAnimation (self):
     move = Movement(0.5)
@@ -196,8 +217,21 @@ class LuxorEngine (Engine):
   def TurnHead (self, angle):
     self.trf_cupula.Rotate(angle,0.0,1.0,0.0)
     self.head_angle += angle
+    if self.clips:
+      turn = np.array(glm.rotate(glm.mat4(1.0),glm.radians(angle),glm.vec3(0.0,1.0,0.0)))
+      for clip in self.clips.values():
+        if self.trf_cupula in clip.GetTransforms():
+          clip.SetPost(self.trf_cupula,clip.GetPost(self.trf_cupula) @ turn)
 
   def Update (self, dt):
     if (self.curr_anim):
-      if (self.curr_anim.Advance(dt,self.reverse)):
+      if self.clips:
+        if not self.player:
+          self.player = ClipPlayer(self.clips[self.curr_anim],
+                                   palette=self.palettes.get(self.curr_anim))
+          self.player.Play(self.reverse)
+        if self.player.Update(dt):
+          self.player = None
+          self.curr_anim = None
+      elif (self.curr_anim.Advance(dt,self.reverse,self.evaluator)):
         self.curr_anim = None
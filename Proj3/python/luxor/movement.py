@@ -19,7 +19,9 @@ class Movement:
     self.rot_trf.append(trf)
     self.rot_interp.append(interp)
 
-  def Advance (self, dt, reverse):
+  def Step (self, dt, reverse):
+    # advance the clock; returns the normalized parameters before and
+    # after the step, and whether the movement ended
     t = self.t + dt
     if (t > self.T):
       t = self.T
@@ -29,6 +31,25 @@ class Movement:
     else:
       t0 = self.t / self.T
       t1 = t / self.T
+    if t >= self.T:  # check if movement ended
+      self.t = 0.0   # reset internal clock
+      return t0, t1, True
+    self.t = t
+    return t0, t1, False
+
+  def GetChannels (self):
+    # transforms, hermite coefficients and rotation flags of all channels
+    trfs = self.trl_trf + self.rot_trf
+    curves = [interp.GetHermite() for interp in self.trl_interp + self.rot_interp]
+    rotation = [False] * len(self.trl_trf) + [True] * len(self.rot_trf)
+    return trfs, curves, rotation
+
+  def Advance (self, dt, reverse):
+    t0, t1, done = self.Step(dt,reverse)
+    self.Apply(t0,t1)
+    return done  # signalize whether the movement ended after this advance
+
+  def Apply (self, t0, t1):
     # perform translations
     for i in range(0,len(self.trl_trf)):
       v0 = self.trl_interp[i].Interpolate(t0)
@@ -41,9 +62,3 @@ class Movement:
       self.rot_trf[i].Rotate(v1[0]-v0[0],1.0,0.0,0.0)
       self.rot_trf[i].Rotate(v1[1]-v0[1],0.0,1.0,0.0)
       self.rot_trf[i].Rotate(v1[2]-v0[2],0.0,0.0,1.0)
-    if t >= self.T:  # check if movement ended
-      self.t = 0.0   # reset internal clock
-      return True   # signalize the movement ended after this advance
-    else:
-      self.t = t
-      return False  # signalize the movement continues
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import numpy as np
+
+# cached palettes by content key, shared by every lamp playing the same clip
+palettes = {}
+
+# Animated matrices of a clip sampled at a fixed rate into a
+# (frames, joints, 4, 4) float32 array. Only the animated part T * R of
+# each target is baked, so rest and post matrices (root motion, head
+# turns) still apply at playback. Playback is an index lookup, plus an
+# optional lerp between the two nearest frames.
+class Palette:
+  def __init__ (self, mats, rate):
+    self.mats = mats
+    self.rate = rate
+
+  @staticmethod
+  def Bake (clip, rate=60):
+    n = int(np.ceil(clip.GetDuration()*rate)) + 1
+    times = np.minimum(np.arange(n)/rate,clip.GetDuration())
+    mats = np.array([clip.SampleLocal(t) for t in times],dtype='float32')
+    return Palette(mats,rate)
+
+  @staticmethod
+  def Load (clip, rate=60, directory=None):
+    # bake once per clip content; with a directory, the palette is saved
+    # with np.save and later runs map the file instead of baking
+    key = PaletteKey(clip,rate)
+    if key in palettes:
+      return palettes[key]
+    palette = None
+    if directory:
+      filename = os.path.join(directory,"palette_" + key + ".npy")
+      if os.path.exists(filename):
+        palette = Palette(np.load(filename,mmap_mode='r'),rate)
+      else:
+        palette = Palette.Bake(clip,rate)
+        os.makedirs(directory,exist_ok=True)
+        np.save(filename,palette.mats)
+    else:
+      palette = Palette.Bake(clip,rate)
+    palettes[key] = palette
+    return palette
+
+  def GetFrameCount (self):
+    return len(self.mats)
+
+  def GetRate (self):
+    return self.rate
+
+  def Sample (self, t, interpolate=True):
+    f = min(max(t*self.rate,0.0),len(self.mats)-1)
+    i = int(f)
+    if not interpolate or i == len(self.mats)-1:
+      return self.mats[int(round(f))]
+    a = f - i
+    return (1.0-a) * self.mats[i] + a * self.mats[i+1]
+
+def PaletteKey (clip, rate):
+  h = hashlib.sha1()
+  h.update(np.ascontiguousarray(clip.times).tobytes())
+  h.update(np.ascontiguousarray(clip.coefs).tobytes())
+  h.update(np.ascontiguousarray(clip.target).tobytes())
+  h.update(np.ascontiguousarray(clip.rotation).tobytes())
+  h.update(str(rate).encode())
+  return h.hexdigest()[:16]
@@ -1,6 +1,7 @@
 from OpenGL.GL import *
 import glfw
 import random as rd
+import glm
 
 from camera2d import *
 from color import *
@@ -11,12 +12,23 @@ from node import *
 from shader import *
 from scene import *
 from engine import *
+from scheduler import Scheduler
+from pipeline import Pipeline
+
+PIPELINED = False   # update engines on a worker thread while drawing
 
 class MovePointer(Engine):
   def __init__ (self, trf):
     self.trf = trf
+    self.base = glm.mat4(trf.GetMatrix())
+    self.prev = self.angle = 0.0
   def Update (self, dt):
-    self.trf.Rotate(6*dt,0,0,-1)
+    self.prev = self.angle
+    self.angle += 6*dt
+  def Interpolate (self, alpha):
+    # draw between the last two steps, so the 60 Hz steps move smoothly
+    angle = self.prev + (self.angle-self.prev)*alpha
+    self.trf.SetMatrix(glm.rotate(self.base,glm.radians(angle),glm.vec3(0,0,-1)))
 
 def initialize ():
   # set background color: white 
@@ -45,16 +57,28 @@ def initialize ():
 
   # build scene
   root = Node(shader, nodes = [face,pointer])
-  global scene 
+  global scene, scheduler, pipeline
   scene = Scene(root)
   scene.AddEngine(MovePointer(trf2))
+  scheduler = Scheduler(scene,60)   # engines step at 60 Hz
+  pipeline = Pipeline(scene,scheduler) if PIPELINED else None
 
 def update (dt):
-  scene.Update(dt)
+  global frame_dt
+  frame_dt = dt
+  if not pipeline:
+    scheduler.Advance(dt)
 
 def display ():
   glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT) 
-  scene.Render(camera)
+  if pipeline:
+    pipeline.Render(camera,frame_dt)
+  else:
+    scene.Render(camera)
+
+def resize (win, width, height):
+  glViewport(0,0,width,height)
+  camera.SetViewport(width,height)
 
 def keyboard (win, key, scancode, action, mods):
    if key == glfw.KEY_Q and action == glfw.PRESS:
@@ -80,6 +104,8 @@ def main():
     print("OpenGL version: ",glGetString(GL_VERSION))
 
     initialize()
+    glfw.set_framebuffer_size_callback(win,resize)
+    resize(win,*glfw.get_framebuffer_size(win))
 
     # Loop until the user closes the window
     t0 = glfw.get_time()
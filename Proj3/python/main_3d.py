@@ -21,6 +21,9 @@ from quad import *
 from variable import *
 from planarshadow import PlanarShadow
 from objmesh import OBJMesh  # loader de .obj (opcional)
+from arena import GetArena
+from indirect import IndirectSupported
+from scheduler import Scheduler
 
 viewer_pos = glm.vec3(2.0, 3.5, 4.0)
 
@@ -29,7 +32,7 @@ def keyboard (win, key, scancode, action, mods):
       glfw.set_window_should_close(win,glfw.TRUE)
 
 def initialize (win):
-  global camera, scene
+  global camera, scene, scheduler
 
   # -----------------------------
   #   ESTADOS OPENGL
@@ -71,9 +74,11 @@ def initialize (win):
   # -----------------------------
   #   GEOMETRIAS BASE (procedurais)
   # -----------------------------
-  cube      = Cube()      # mesa
-  sphere    = Sphere()    # vamos usar só para a Terra (para preservar UV)
-  cylinder  = Cylinder()
+  # todas as malhas compartilham os buffers de uma arena
+  arena     = GetArena()
+  cube      = Cube(arena=arena)      # mesa
+  sphere    = Sphere(arena=arena)    # vamos usar só para a Terra (para preservar UV)
+  cylinder  = Cylinder(arena=arena)
 
   # -----------------------------
   #   TENTATIVAS DE CARREGAR .OBJ
@@ -81,7 +86,7 @@ def initialize (win):
   def load_obj_or_none(filename):
       path = os.path.join(models_dir, filename)
       if os.path.exists(path):
-          return OBJMesh(path)
+          return OBJMesh(path, arena=arena)
       return None
 
   box_mesh      = load_obj_or_none("box.obj")
@@ -154,17 +159,20 @@ def initialize (win):
   shadow_shader.AttachFragmentShader(os.path.join(sh_dir, "shadow_fragment.glsl"))
   shadow_shader.Link()
 
+  # desenha todos os objetos só com material em uma chamada (GL 4.3+)
+  indirect_shader = None
+  if IndirectSupported():
+    indirect_shader = Shader(light, "camera")
+    indirect_shader.AttachVertexShader(os.path.join(sh_dir, "vertex_indirect.glsl"))
+    indirect_shader.AttachFragmentShader(os.path.join(sh_dir, "fragment_indirect.glsl"))
+    indirect_shader.Link()
+
+  # matriz de modelo e cor por instância (Scene.SetInstancing)
   instanced_shader = Shader(light, "camera")
-  instanced_shader.AttachVertexShader(os.path.join(sh_dir, "instanced_vertex.glsl"))
-  instanced_shader.AttachGeometryShader(os.path.join(sh_dir, "instanced_geom.glsl"))
-  instanced_shader.AttachFragmentShader(os.path.join(sh_dir, "instanced_fragment.glsl"))
+  instanced_shader.AttachVertexShader(os.path.join(sh_dir, "vertex_instanced.glsl"))
+  instanced_shader.AttachFragmentShader(os.path.join(sh_dir, "fragment_instanced.glsl"))
   instanced_shader.Link()
 
-  instanced_shader.UseProgram()
-  instanced_shader.SetUniform("instanceCount", 1) 
-  instanced_shader.SetUniform("instanceOffsets", [glm.vec3(0.0, 0.0, 0.0)])
-  glUseProgram(0)
-
   # -----------------------------
   #   TEXTURAS
   # -----------------------------
@@ -305,19 +313,29 @@ def initialize (win):
       obj_trf = Transform()
       obj_trf.Scale(0.4, 0.4, 0.4)
       obj_trf.Translate(-0.5, 0.5, -0.5)
-      obj_mesh = OBJMesh(teapot_path)
+      obj_mesh = OBJMesh(teapot_path, arena=arena)
       obj_node = Node(None, obj_trf, [Material(0.7, 0.7, 0.7)], [obj_mesh])
       table_node.AddNode(obj_node)
 
+  table_node.Freeze()     # nada na mesa se move
+
   scene = Scene(root)
+  scene.BakeStatic(True)  # merge static meshes sharing material
+  scene.SetIndirect(shader, indirect_shader)
+  scene.SetSorted(True)   # group draws by shader; shadows are drawn last
+  scene.SetInstancing(True) # nodes sharing shape and material: one draw
+  scene.SetCulling(True)  # skip subtrees outside the view frustum
+  scene.SetOcclusion(True) # skip heavy meshes hidden by other objects
+
+  scheduler = Scheduler(scene,60)   # engines step at 60 Hz
 
 def display (win):
   glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
   scene.Render(camera)
 
-def resize_win (win):
-  width, height = glfw.get_framebuffer_size(win)
+def resize_win (win, width, height):
   glViewport(0, 0, width, height)
+  camera.SetViewport(width, height)
 
 def main():
     if not glfw.init():
@@ -338,10 +356,15 @@ def main():
     print("OpenGL version:", glGetString(GL_VERSION))
 
     initialize(win)
+    glfw.set_framebuffer_size_callback(win, resize_win)
+    resize_win(win, *glfw.get_framebuffer_size(win))
 
+    t0 = glfw.get_time()
     while not glfw.window_should_close(win):
+        t = glfw.get_time()
+        scheduler.Advance(t-t0)
+        t0 = t
         display(win)
-        resize_win(win)
         glfw.swap_buffers(win)
         glfw.poll_events()
 
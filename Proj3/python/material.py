@@ -2,6 +2,8 @@ import glm
 from appearance import Appearance
 
 class Material(Appearance):
+    changes = 0   # bumped by every setter, so packed copies know to refresh
+
     def __init__ (self, r, g, b, opacity=1.0):
       Appearance.__init__(self)
       self.amb = glm.vec4(r,g,b,1)
@@ -10,29 +12,40 @@ class Material(Appearance):
       self.shi = 32.0
       self.opacity = opacity
 
+    def Touch (self):
+      Material.changes += 1
+
     def SetAmbient (self, r, g, b, a=1):
       self.amb[0] = r
       self.amb[1] = g
       self.amb[2] = b
       self.amb[3] = a
+      self.Touch()
     
     def SetDiffuse (self, r, g, b, a=1):
       self.dif[0] = r
       self.dif[1] = g
       self.dif[2] = b
       self.dif[3] = a
+      self.Touch()
     
     def SetSpecular (self, r, g, b, a=1):
       self.spe[0] = r
       self.spe[1] = g
       self.spe[2] = b
       self.spe[3] = a 
+      self.Touch()
     
     def SetShininess (self, shi):
       self.shi = shi
+      self.Touch()
 
     def SetOpacity (self, opacity):
       self.opacity = opacity
+      self.Touch()
+    
+    def IsBlended (self):
+      return self.opacity < 1.0
     
     def Load (self, st):
       shd = st.GetShader()
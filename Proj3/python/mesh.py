@@ -1,9 +1,13 @@
 from OpenGL.GL import *
 from shape import Shape
+from bounds import Bounds
+from vertexlayout import VertexLayout, FLOAT, SNORM10
 import numpy as np
 
+MESH_LAYOUT = VertexLayout(((0,3,FLOAT),(1,3,SNORM10)))   # coord, normal
+
 class Mesh (Shape):
-  def __init__ (self, filename):
+  def __init__ (self, filename, arena=None):
     coords = []
     normals = []
     indices = []
@@ -25,24 +29,31 @@ class Mesh (Shape):
     vcoords = np.array(coords,dtype='float32')
     vnormals = np.array(normals,dtype='float32')
     vindices = np.array(indices,dtype='uint32')
-    # create VAO
-    self.vao = glGenVertexArrays(1)
-    glBindVertexArray(self.vao)
-    ids = glGenBuffers(3)
-    # create coord and normal buffers
-    glBindBuffer(GL_ARRAY_BUFFER,ids[0])
-    glBufferData(GL_ARRAY_BUFFER,vcoords.nbytes,vcoords,GL_STATIC_DRAW)
-    glVertexAttribPointer(0,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(0) 
-    glBindBuffer(GL_ARRAY_BUFFER,ids[1])
-    glBufferData(GL_ARRAY_BUFFER,vnormals.nbytes,vnormals,GL_STATIC_DRAW)
-    glVertexAttribPointer(1,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(1) 
-    # create index buffer
-    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER,ids[2])
-    glBufferData(GL_ELEMENT_ARRAY_BUFFER,vindices.nbytes,vindices,GL_STATIC_DRAW)
+    self.bounds = Bounds(vcoords)
     self.nind = len(indices)
+    if arena:
+      self.geometry = arena.Allocate({0:vcoords,1:vnormals},vindices)
+      return
+    self.vao, self.buffers, self.itype = MESH_LAYOUT.Upload({0:vcoords,1:vnormals},vindices)
+
+  def GetTriangleCount (self):
+    return self.nind // 3
 
   def Draw (self, st):
+    if self.geometry:
+      self.geometry.Draw()
+      return
+    glBindVertexArray(self.vao)
+    glDrawElements(GL_TRIANGLES,self.nind,self.itype,None)
+
+  def IsInstanceable (self):
+    return True
+
+  def DrawInstanced (self, st, instances):
+    if self.geometry:
+      self.geometry.DrawInstanced(instances)
+      return
     glBindVertexArray(self.vao)
-    glDrawElements(GL_TRIANGLES,self.nind,GL_UNSIGNED_INT,None)
\ No newline at end of file
+    instances.Attach()
+    glDrawElementsInstanced(GL_TRIANGLES,self.nind,self.itype,None,instances.GetCount())
+    instances.Detach()
@@ -8,31 +8,63 @@ class Node:
     self.apps = apps or []
     self.shps = shps or []
     self.nodes = []
+    # cached world matrix: 'stamp' changes whenever it is recomputed, and
+    # 'key' records the parent stamp and transform version it was built from
+    self.world = glm.mat4(1.0)
+    self.stamp = 0
+    self.key = None
+    # structure revision, bumped up to the root when the graph changes
+    self.revision = 0
+    self.frozen = False
     if nodes:
       for n in nodes:
         self.AddNode(n)
 
   def SetShader (self, shader):
     self.shader = shader
+    self.Invalidate()
 
   def GetShader (self):
     return self.shader
   
   def SetTransform (self, trf):
     self.trf = trf
+    self.key = None
   
   def AddAppearance (self, app):
     self.apps.append(app)
+    self.Invalidate()
   
   def AddShape (self, shp):
     self.shps.append(shp)
+    self.Invalidate()
   
   def AddNode (self, node):
     self.nodes.append(node)
     node.SetParent(self)
+    self.Invalidate()
+
+  def Invalidate (self):
+    # signal a structural change so compiled render lists get rebuilt
+    node = self
+    while node:
+      node.revision += 1
+      node = node.GetParent()
+
+  def Freeze (self, flag=True):
+    # mark the subtree as static, so Scene.BakeStatic may merge its shapes
+    self.frozen = flag
+    self.Invalidate()
+
+  def IsFrozen (self):
+    return self.frozen
+
+  def GetRevision (self):
+    return self.revision
   
   def SetParent (self, parent):
     self.parent = parent
+    self.key = None
   
   def GetParent (self):
     return self.parent
@@ -43,13 +75,38 @@ class Node:
     else:
       return glm.mat4(1.0)
   
+  def GetTransformVersion (self):
+    if self.trf:
+      return self.trf.GetVersion()
+    else:
+      return -1
+
+  def UpdateWorldMatrix (self):
+    # assumes the parent's cached matrix is already up to date
+    if self.parent:
+      key = (self.parent.stamp, self.GetTransformVersion())
+    else:
+      key = (0, self.GetTransformVersion())
+    if key != self.key:
+      if self.parent:
+        self.world = self.parent.world * self.GetMatrix()
+      else:
+        self.world = glm.mat4(self.GetMatrix())
+      self.key = key
+      self.stamp += 1
+    return self.world
+
   def GetModelMatrix (self):
-    mat = self.GetMatrix()
-    node = self.GetParent()
+    # refresh the cached matrices from the root down; only nodes whose own
+    # transform or an ancestor's changed are recomputed
+    chain = []
+    node = self
     while node:
-      mat = node.GetMatrix() * mat
+      chain.append(node)
       node = node.GetParent()
-    return mat
+    for node in reversed(chain):
+      node.UpdateWorldMatrix()
+    return self.world
   
   def Render (self, st):
     # load
@@ -0,0 +1,139 @@
+import numpy as np
+
+# Wavefront OBJ geometry read in bulk: records are separated by comparing
+# the prefixes of all lines in one numpy call, and each block of v/vt/vn values and of face
+# corners is converted with a single numpy call. Polygons are fan
+# triangulated, negative (relative) indices are resolved, and faces are
+# grouped into submeshes by o/g name and usemtl material.
+class OBJFile:
+  def __init__ (self, filename):
+    with open(filename,'r',encoding='utf-8',errors='ignore') as f:
+      lines = [line.lstrip() for line in f.read().replace("\t"," ").splitlines()]
+    heads = np.array([line[:2] for line in lines])
+    voff, vrecs = FindRecords(lines,heads,"v")
+    toff, trecs = FindRecords(lines,heads,"vt")
+    noff, nrecs = FindRecords(lines,heads,"vn")
+    foff, frecs = FindRecords(lines,heads,"f")
+    self.positions = ParseFloats(vrecs,3)
+    self.texcoords = ParseFloats(trecs,2)
+    self.normals = ParseFloats(nrecs,3)
+    # corner tokens of all faces, and the number of corners of each
+    faces = [rec.split() for rec in frecs]
+    counts = np.array([len(face) for face in faces],dtype='int64')
+    polygon = counts >= 3
+    corners = ParseCorners([tok for face in faces if len(face) >= 3 for tok in face])
+    counts, foff = counts[polygon], foff[polygon]
+    # negative indices are relative to the records defined before the face
+    bases = np.stack([np.searchsorted(off,foff) for off in (voff,toff,noff)],axis=-1)
+    corners = ResolveIndices(corners,np.repeat(bases.reshape(-1,3),counts,axis=0))
+    first, faceof = FanTriangulate(counts)
+    # submesh of each face: (o/g name, usemtl material) in effect at its line
+    keys, self.submeshes = GroupFaces(lines,heads,foff)
+    keys = keys[faceof]
+    order = np.argsort(keys,kind='stable')   # file order within each submesh
+    self.triangles = corners[first[order]]   # (t,3,3): triangle, corner, v/vt/vn
+    ntri = np.bincount(keys,minlength=len(self.submeshes))
+    start = 0
+    for i, (grp, mtl) in enumerate(self.submeshes):
+      self.submeshes[i] = (grp,mtl,start,int(ntri[i]))
+      start += int(ntri[i])
+
+  def GetPositions (self):
+    return self.positions
+
+  def GetTexcoords (self):
+    return self.texcoords
+
+  def GetNormals (self):
+    return self.normals
+
+  def GetTriangles (self):
+    return self.triangles
+
+  def GetTriangleCount (self):
+    return len(self.triangles)
+
+  def GetSubmeshes (self):
+    # (group, material, first triangle, triangle count)
+    return self.submeshes
+
+# line numbers and contents of the records 'tag', selected by comparing
+# the first two characters of all lines at once
+def FindRecords (lines, heads, tag):
+  index = np.flatnonzero((heads == (tag+" ")[:2]) | (heads == tag))
+  if len(tag) > 2:
+    index = np.array([i for i in index if lines[i].split(None,1)[0] == tag],dtype='int64')
+  return index, [lines[i][len(tag):] for i in index]
+
+# submesh index of the faces at lines 'foff', and the (group, material)
+# of each submesh, in order of first use
+def GroupFaces (lines, heads, foff):
+  ooff, orecs = FindRecords(lines,heads,"o")
+  goff, grecs = FindRecords(lines,heads,"g")
+  moff, mrecs = FindRecords(lines,heads,"usemtl")
+  goff = np.concatenate((ooff,goff))
+  grecs = [(orecs+grecs)[i] for i in np.argsort(goff,kind='stable')]
+  goff = np.sort(goff)
+  # names in effect at each face; index 0 is "none yet"
+  gnames, gid = Intern([None] + [rec.strip() or None for rec in grecs])
+  mnames, mid = Intern([None] + [rec.strip() or None for rec in mrecs])
+  pair = gid[np.searchsorted(goff,foff)]*len(mnames) + mid[np.searchsorted(moff,foff)]
+  pairs, first, keys = np.unique(pair,return_index=True,return_inverse=True)
+  order = np.argsort(first)
+  rank = np.empty(len(pairs),dtype='int64')
+  rank[order] = np.arange(len(pairs))
+  submeshes = [(gnames[p//len(mnames)],mnames[p%len(mnames)]) for p in pairs[order]]
+  return rank[keys.ravel()], submeshes
+
+# distinct values of a list, and the index of each element among them
+def Intern (values):
+  ids = {}
+  index = np.array([ids.setdefault(v,len(ids)) for v in values],dtype='int64')
+  return list(ids), index
+
+# first n values of each record, as an (len(records),n) float32 array
+def ParseFloats (records, n):
+  if not records:
+    return np.zeros((0,n),dtype='float32')
+  data = np.fromstring(" ".join(records),dtype='float64',sep=" ")
+  if len(data) != n*len(records):
+    # records with extra (w, colors) or missing values
+    data = np.zeros((len(records),n))
+    for i, rec in enumerate(records):
+      vals = rec.split()[:n]
+      data[i,:len(vals)] = [float(v) for v in vals]
+  return data.reshape(-1,n).astype('float32')
+
+# "v", "v/vt", "v//vn" or "v/vt/vn" tokens -> (n,3) one-based indices, 0 when missing
+def ParseCorners (tokens):
+  if not tokens:
+    return np.zeros((0,3),dtype='int64')
+  text = " ".join(tokens)
+  nfields = tokens[0].count("/") + 1
+  data = np.fromstring(text.replace("//","/0/").replace("/"," "),dtype='int64',sep=" ")
+  if len(data) == nfields*len(tokens):
+    out = np.zeros((len(tokens),3),dtype='int64')
+    out[:,:nfields] = data.reshape(-1,nfields)
+    return out
+  # forms mixed within the file
+  out = np.zeros((len(tokens),3),dtype='int64')
+  for i, tok in enumerate(tokens):
+    for j, val in enumerate(tok.split("/")[:3]):
+      if val:
+        out[i,j] = int(val)
+  return out
+
+# one-based and negative (relative to 'bases', the counts defined so far)
+# indices -> zero-based, -1 when missing
+def ResolveIndices (corners, bases):
+  return np.where(corners > 0,corners-1,np.where(corners < 0,bases+corners,-1))
+
+# fan triangulation of faces with 'counts' corners: (t,3) corner indices
+# and the face of each triangle
+def FanTriangulate (counts):
+  ntri = np.maximum(counts-2,0)
+  start = np.concatenate(([0],np.cumsum(counts)[:-1]))
+  faceof = np.repeat(np.arange(len(counts)),ntri)
+  k = np.arange(len(faceof)) - np.repeat(np.cumsum(ntri)-ntri,ntri) + 1
+  base = start[faceof]
+  return np.stack((base,base+k,base+k+1),axis=-1), faceof
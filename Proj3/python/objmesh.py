@@ -1,147 +1,138 @@
 # objmesh.py
 from OpenGL.GL import *
 from shape import Shape
+from bounds import Bounds
+from vertexlayout import STANDARD_LAYOUT
+from objfile import OBJFile
 import numpy as np
 
 class OBJMesh(Shape):
     """
-    Loader simples para OBJ triangular com v / vt / vn e calculo automatico de Tangentes.
+    Loader para OBJ com v / vt / vn e calculo automatico de Tangentes.
+    Poligonos sao triangulados em leque; grupos o/g/usemtl viram submalhas.
+    Cada tripla (v, vt, vn) distinta vira um unico vertice indexado.
     """
-    def __init__(self, filename):
-        verts = []
-        norms = []
-        uvs = []
-
-        positions = []
-        normals = []
-        texcoords = []
-
-        with open(filename, 'r', encoding='utf-8', errors='ignore') as f:
-
-            for line in f:
-                if line.startswith("#") or line.strip() == "":
-                    continue
-                parts = line.strip().split()
-                if parts[0] == "v":
-                    verts.append(tuple(map(float, parts[1:4])))
-                elif parts[0] == "vt":
-                    uvs.append(tuple(map(float, parts[1:3])))
-                elif parts[0] == "vn":
-                    norms.append(tuple(map(float, parts[1:4])))
-                elif parts[0] == "f":
-                    
-                    # Triangulação forçada (assume que o OBJ já é triangular)
-                    for vtx in parts[1:4]: 
-                        values = vtx.split("/")
-                        vi = int(values[0]) - 1
-                        ti = int(values[1]) - 1 if len(values) > 1 and values[1] != "" else None
-                        ni = int(values[2]) - 1 if len(values) > 2 and values[2] != "" else None
-
-                        positions.append(verts[vi])
-                        normals.append(norms[ni] if ni is not None else (0,1,0))
-                        texcoords.append(uvs[ti] if ti is not None else (0,0))
-
-        # Converte para Numpy Arrays
-        positions = np.array(positions, dtype=np.float32)
-        normals   = np.array(normals, dtype=np.float32)
-        texcoords = np.array(texcoords, dtype=np.float32)
-        
-        # Inicializa array de tangentes
-        tangents  = np.zeros_like(positions, dtype=np.float32)
-        
+    def __init__(self, filename, arena=None):
+        obj = OBJFile(filename)
+        corners = obj.GetTriangles().reshape(-1, 3)   # v/vt/vn de cada canto
+
+        # ---------------------------------------------------------
+        # 1. Vértices únicos e índices
+        # ---------------------------------------------------------
+        keys, indices = UniqueCorners(corners)
+        positions = obj.GetPositions()[keys[:, 0]]
+        normals = Gather(obj.GetNormals(), keys[:, 2], (0, 1, 0))
+        texcoords = Gather(obj.GetTexcoords(), keys[:, 1], (0, 0))
+        self.stats = {"corners": len(corners), "vertices": len(keys)}
+
         # ---------------------------------------------------------
         # 2. CÁLCULO DAS TANGENTES
         # ---------------------------------------------------------
-        # Como os arrays são "flat" (sopa de triângulos), iteramos a cada 3 vértices
-        num_verts = len(positions)
-        for i in range(0, num_verts, 3):
-            # Pega os 3 vértices do triângulo atual
-            p0 = positions[i]
-            p1 = positions[i+1]
-            p2 = positions[i+2]
-            
-            # Pega os 3 UVs
-            uv0 = texcoords[i]
-            uv1 = texcoords[i+1]
-            uv2 = texcoords[i+2]
-
-            # Arestas do triângulo (Posição)
-            edge1 = p1 - p0
-            edge2 = p2 - p0
-
-            # Diferença no UV (Delta UV)
-            deltaUV1 = uv1 - uv0
-            deltaUV2 = uv2 - uv0
-
-            # Cálculo do determinante
-            f = 1.0
-            det = (deltaUV1[0] * deltaUV2[1] - deltaUV2[0] * deltaUV1[1])
-            
-            if abs(det) > 1e-6: # Evita divisão por zero
-                f = 1.0 / det
-            
-            # Fórmula da Tangente
-            tx = f * (deltaUV2[1] * edge1[0] - deltaUV1[1] * edge2[0])
-            ty = f * (deltaUV2[1] * edge1[1] - deltaUV1[1] * edge2[1])
-            tz = f * (deltaUV2[1] * edge1[2] - deltaUV1[1] * edge2[2])
-            
-            tangent = np.array([tx, ty, tz], dtype=np.float32)
-            
-            # Normaliza a tangente
-            norm_val = np.linalg.norm(tangent)
-            if norm_val > 0:
-                tangent = tangent / norm_val
-
-            # Aplica a mesma tangente para os 3 vértices do triângulo
-            tangents[i]   = tangent
-            tangents[i+1] = tangent
-            tangents[i+2] = tangent
-
-        # (Opcional) Ortogonalização de Gram-Schmidt para garantir T perpendicular a N
-        # Isso melhora a qualidade visual, removendo distorções
-        for i in range(num_verts):
-            t = tangents[i]
-            n = normals[i]
-            # T = normalize(T - N * dot(N, T))
-            ortho_t = t - n * np.dot(n, t)
-            norm_val = np.linalg.norm(ortho_t)
-            if norm_val > 0:
-                tangents[i] = ortho_t / norm_val
+        tangents = Tangents(positions, normals, texcoords, indices)
+
+        # submalhas: (grupo, material, primeiro índice, número de índices)
+        self.submeshes = [(grp, mtl, 3 * first, 3 * count)
+                          for grp, mtl, first, count in obj.GetSubmeshes()]
 
         # ---------------------------------------------------------
         # 3. Configuração OpenGL
         # ---------------------------------------------------------
-        self.nvert = len(positions)
+        self.nind = len(indices)
+        self.bounds = Bounds(positions)
+        if arena:
+            self.geometry = arena.Allocate({0: positions, 1: normals, 2: tangents, 3: texcoords},
+                                           indices)
+            return
 
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
+        self.vao, self.buffers, self.itype = STANDARD_LAYOUT.Upload(
+            {0: positions, 1: normals, 2: tangents, 3: texcoords}, indices)
 
-        ids = glGenBuffers(4)
+    def GetTriangleCount(self):
+        return self.nind // 3
 
-        # Location 0: Position
-        glBindBuffer(GL_ARRAY_BUFFER, ids[0])
-        glBufferData(GL_ARRAY_BUFFER, positions.nbytes, positions, GL_STATIC_DRAW)
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
-        glEnableVertexAttribArray(0)
+    def GetSubmeshes(self):
+        return self.submeshes
 
-        # Location 1: Normal
-        glBindBuffer(GL_ARRAY_BUFFER, ids[1])
-        glBufferData(GL_ARRAY_BUFFER, normals.nbytes, normals, GL_STATIC_DRAW)
-        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, None)
-        glEnableVertexAttribArray(1)
+    def GetStats(self):
+        # vértices antes (cantos de triângulos) e depois da deduplicação
+        stats = dict(self.stats)
+        if stats["corners"]:
+            stats["vertex_reduction"] = 1.0 - stats["vertices"] / stats["corners"]
+        return stats
 
-        # Location 2: Tangent (AGORA TEM DADOS REAIS!)
-        glBindBuffer(GL_ARRAY_BUFFER, ids[2])
-        glBufferData(GL_ARRAY_BUFFER, tangents.nbytes, tangents, GL_STATIC_DRAW)
-        glVertexAttribPointer(2, 3, GL_FLOAT, GL_FALSE, 0, None)
-        glEnableVertexAttribArray(2)
+    def Draw(self, st):
+        if self.geometry:
+            self.geometry.Draw()
+            return
+        glBindVertexArray(self.vao)
+        glDrawElements(GL_TRIANGLES, self.nind, self.itype, None)
 
-        # Location 3: TexCoord
-        glBindBuffer(GL_ARRAY_BUFFER, ids[3])
-        glBufferData(GL_ARRAY_BUFFER, texcoords.nbytes, texcoords, GL_STATIC_DRAW)
-        glVertexAttribPointer(3, 2, GL_FLOAT, GL_FALSE, 0, None)
-        glEnableVertexAttribArray(3)
+    def IsInstanceable(self):
+        return True
 
-    def Draw(self, st):
+    def DrawInstanced(self, st, instances):
+        if self.geometry:
+            self.geometry.DrawInstanced(instances)
+            return
         glBindVertexArray(self.vao)
-        glDrawArrays(GL_TRIANGLES, 0, self.nvert)
+        instances.Attach()
+        glDrawElementsInstanced(GL_TRIANGLES, self.nind, self.itype, None, instances.GetCount())
+        instances.Detach()
+
+
+# atributos por vértice; índice -1 (ausente) recebe 'default'
+def Gather(values, index, default):
+    out = np.empty((len(index), len(default)), dtype=np.float32)
+    out[:] = default
+    valid = index >= 0
+    out[valid] = values[index[valid]]
+    return out
+
+
+# triplas (v, vt, vn) distintas, na ordem do primeiro uso, e o índice de
+# cada canto entre elas; as triplas são empacotadas num inteiro para que
+# np.unique trabalhe sobre uma única coluna
+def UniqueCorners(corners):
+    if len(corners) == 0:
+        return corners, np.zeros(0, dtype=np.int64)
+    c = corners + 1   # -1 (ausente) vira 0
+    size = c.max(axis=0) + 1
+    if float(size[0]) * float(size[1]) * float(size[2]) < 2.0 ** 62:
+        packed = (c[:, 0] * size[1] + c[:, 1]) * size[2] + c[:, 2]
+        _, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(corners, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[order] = np.arange(len(first))
+    return corners[first[order]], rank[inverse.ravel()]
+
+
+# uma tangente por triângulo (a partir das derivadas de UV), acumulada nos
+# vértices que o compõem e ortogonalizada em relação à normal (Gram-Schmidt)
+def Tangents(positions, normals, texcoords, indices):
+    p = positions[indices].reshape(-1, 3, 3)
+    uv = texcoords[indices].reshape(-1, 3, 2)
+    edge1 = p[:, 1] - p[:, 0]
+    edge2 = p[:, 2] - p[:, 0]
+    deltaUV1 = uv[:, 1] - uv[:, 0]
+    deltaUV2 = uv[:, 2] - uv[:, 0]
+    det = deltaUV1[:, 0] * deltaUV2[:, 1] - deltaUV2[:, 0] * deltaUV1[:, 1]
+    f = np.ones_like(det)
+    ok = np.abs(det) > 1e-6   # evita divisão por zero
+    f[ok] = 1.0 / det[ok]
+    t = f[:, None] * (deltaUV2[:, 1:2] * edge1 - deltaUV1[:, 1:2] * edge2)
+    tangents = np.zeros_like(positions)
+    np.add.at(tangents, indices, np.repeat(NormalizeRows(t), 3, axis=0))
+    tangents = NormalizeRows(tangents)
+    ortho = tangents - normals * np.sum(normals * tangents, axis=1, keepdims=True)
+    norm = np.linalg.norm(ortho, axis=1)
+    tangents[norm > 0] = ortho[norm > 0] / norm[norm > 0, None]
+    return tangents.astype(np.float32)
+
+
+def NormalizeRows(v):
+    norm = np.linalg.norm(v, axis=1)
+    v = v.copy()
+    v[norm > 0] /= norm[norm > 0, None]
+    return v
@@ -0,0 +1,157 @@
+from OpenGL.GL import *
+import numpy as np
+import glm
+import os
+
+from shader import Shader
+from bounds import UnionBounds
+
+SHADER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","shaders","occlusion")
+
+# Occlusion culling for expensive records: every frame the bounding box of
+# each one is drawn inside a GL_ANY_SAMPLES_PASSED query, after the scene.
+# The next frame reads the result only if it is already available (no
+# stall): occluded records are skipped, and records whose result is still
+# pending are drawn under conditional rendering.
+class OcclusionCuller:
+  def __init__ (self, records, threshold):
+    self.threshold = threshold
+    self.records = [rec for rec in records if self.IsHeavy(rec)]
+    self.frame = 0
+    self.boxes = {}      # record index -> local box matrix
+    self.queries = {}    # record index -> two queries, used alternately
+    self.issued = {}     # record index -> frames whose query was issued
+    self.visible = {}    # record index -> last known result
+    self.conditional = False
+    self.stats = {"occluded": 0, "conditional": 0}
+    for rec in self.records:
+      bmin, bmax = UnionBounds([shp.GetBounds() for shp in rec.shps])
+      box = glm.translate(glm.mat4(1.0),glm.vec3(*bmin))
+      box = glm.scale(box,glm.vec3(*(bmax-bmin)))
+      self.boxes[rec.index] = box
+      self.queries[rec.index] = glGenQueries(2)
+      self.issued[rec.index] = [False,False]
+      self.visible[rec.index] = True
+    self.shader = None
+    self.vao = None
+    self.buffers = None
+    if self.records:
+      self.CreateBox()
+
+  def IsHeavy (self, rec):
+    if rec.instances:
+      return False
+    if any(app.TransformsGeometry() or app.IsBlended() for app in rec.apps):
+      return False
+    if any(shp.GetBounds() is None for shp in rec.shps):
+      return False
+    return sum(shp.GetTriangleCount() for shp in rec.shps) >= self.threshold
+
+  def CreateBox (self):
+    self.shader = Shader()
+    self.shader.AttachVertexShader(os.path.join(SHADER_DIR,"vertex.glsl"))
+    self.shader.AttachFragmentShader(os.path.join(SHADER_DIR,"fragment.glsl"))
+    self.shader.Link()
+    # unit cube [0,1]^3, counter clockwise faces
+    coords = np.array([[x,y,z] for z in (0,1) for y in (0,1) for x in (0,1)],dtype='float32')
+    index = np.array([
+      0,2,3,0,3,1, 4,5,7,4,7,6, 0,4,6,0,6,2,
+      1,3,7,1,7,5, 0,1,5,0,5,4, 2,6,7,2,7,3
+    ],dtype='uint32')
+    self.vao = glGenVertexArrays(1)
+    glBindVertexArray(self.vao)
+    self.buffers = ids = glGenBuffers(2)
+    glBindBuffer(GL_ARRAY_BUFFER,ids[0])
+    glBufferData(GL_ARRAY_BUFFER,coords.nbytes,coords,GL_STATIC_DRAW)
+    glVertexAttribPointer(0,3,GL_FLOAT,GL_FALSE,0,None)
+    glEnableVertexAttribArray(0)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER,ids[1])
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER,index.nbytes,index,GL_STATIC_DRAW)
+    glBindVertexArray(0)
+
+  def Delete (self):
+    # free the queries, the box geometry and its program
+    for queries in self.queries.values():
+      glDeleteQueries(2,queries)
+    self.queries = {}
+    self.records = []
+    if self.vao:
+      glDeleteBuffers(2,self.buffers)
+      glDeleteVertexArrays(1,[self.vao])
+      glDeleteProgram(self.shader.pid)
+      for sid in self.shader.shaders:
+        glDeleteShader(sid)
+      self.vao = None
+
+  def IsTested (self, rec):
+    return rec.index in self.queries
+
+  def NewFrame (self):
+    self.frame += 1
+    self.stats["occluded"] = 0
+    self.stats["conditional"] = 0
+
+  def BeginDraw (self, rec):
+    # returns False if the record should be skipped this frame
+    slot = (self.frame+1) % 2   # query issued in the previous frame
+    if not self.issued[rec.index][slot]:
+      return True
+    q = self.queries[rec.index][slot]
+    res = np.zeros(1,dtype='uint32')
+    glGetQueryObjectuiv(q,GL_QUERY_RESULT_AVAILABLE,res)
+    if res[0]:
+      glGetQueryObjectuiv(q,GL_QUERY_RESULT,res)
+      self.issued[rec.index][slot] = False
+      self.visible[rec.index] = bool(res[0])
+      if not res[0]:
+        self.stats["occluded"] += 1
+      return bool(res[0])
+    # result still pending: let the GPU decide without waiting
+    glBeginConditionalRender(q,GL_QUERY_NO_WAIT)
+    self.conditional = True
+    self.stats["conditional"] += 1
+    return True
+
+  def EndDraw (self, rec):
+    if self.conditional:
+      glEndConditionalRender()
+      self.conditional = False
+
+  def IssueQueries (self, st, visible=None):
+    # draw the boxes of the tested records against the current depth buffer
+    if not self.records:
+      return
+    camera = st.GetCamera()
+    vp = camera.GetProjMatrix() * camera.GetViewMatrix()
+    eye = glm.vec3(glm.inverse(camera.GetViewMatrix()) * glm.vec4(0,0,0,1))
+    slot = self.frame % 2
+    self.shader.UseProgram()
+    glBindVertexArray(self.vao)
+    gs = st.GetRenderState()
+    gs.Push()
+    gs.ColorMask(False,False,False,False)
+    gs.DepthMask(False)
+    gs.Flush()
+    for rec in self.records:
+      if visible and not visible[rec.index]:
+        self.issued[rec.index][slot] = False
+        continue    # frustum culled: nothing to test
+      mat = rec.node.world * self.boxes[rec.index]
+      # the box would be clipped by the near plane: assume visible
+      local = glm.inverse(mat) * glm.vec4(eye,1.0)
+      if all(-0.1 <= local[i] <= 1.1 for i in range(3)):
+        self.visible[rec.index] = True
+        self.issued[rec.index][slot] = False
+        continue
+      self.shader.SetUniform("Mvp",vp*mat)
+      q = self.queries[rec.index][slot]
+      glBeginQuery(GL_ANY_SAMPLES_PASSED,q)
+      glDrawElements(GL_TRIANGLES,36,GL_UNSIGNED_INT,None)
+      glEndQuery(GL_ANY_SAMPLES_PASSED)
+      self.issued[rec.index][slot] = True
+    gs.Pop()
+    gs.Flush()
+    glUseProgram(0)
+
+  def GetStats (self):
+    return self.stats
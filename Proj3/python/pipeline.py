@@ -0,0 +1,73 @@
+import threading
+
+# Overlaps simulation with GL submission. Engines (through a Scheduler, if
+# given) update frame N+1 on a worker thread, which also computes the new
+# world matrices into the back buffer of the scene's TransformHierarchy.
+# Meanwhile the GL thread draws frame N from the matrices published at the
+# last fence. Each Render waits for the worker (the fence), publishes its
+# matrices to the nodes, starts the next update and then draws.
+# Engines must not change the graph structure; cameras and lights that
+# follow a node read its live transform.
+class Pipeline:
+  def __init__ (self, scene, scheduler=None, store=None):
+    self.scene = scene
+    self.scheduler = scheduler
+    scene.SetTransformStore(store)   # world matrices come from a hierarchy
+    self.world = None    # (hierarchy, matrices) computed by the last update
+    self.dt = 0.0
+    self.error = None
+    self.start = threading.Event()
+    self.done = threading.Event()
+    self.done.set()
+    self.running = True
+    self.thread = threading.Thread(target=self.Run,daemon=True)
+    self.thread.start()
+
+  def Run (self):
+    while True:
+      self.start.wait()
+      self.start.clear()
+      if not self.running:
+        return
+      try:
+        if self.scheduler:
+          self.scheduler.Advance(self.dt)
+        else:
+          self.scene.Update(self.dt)
+        hierarchy = self.scene.hierarchy
+        self.world = (hierarchy,hierarchy.Compute())
+      except Exception as e:
+        self.error = e
+      self.done.set()
+
+  def Wait (self):
+    # frame fence: the worker is idle after this returns
+    self.done.wait()
+    if self.error:
+      error, self.error = self.error, None
+      raise error
+
+  def Render (self, camera, dt):
+    self.Wait()
+    # recompile, if needed, while the worker is idle
+    scene = self.scene
+    scene.GetRecords()
+    computed, world = self.world or (None,None)
+    self.world = None
+    if computed is not scene.hierarchy:
+      # the last update was computed for a replaced hierarchy
+      scene.hierarchy.Update()
+    else:
+      scene.hierarchy.Sync(world)
+    if scene.bakekeys and scene.IsBakeStale():
+      scene.Compile()
+    self.dt = dt
+    self.done.clear()
+    self.start.set()
+    self.scene.Render(camera,False)
+
+  def Stop (self):
+    self.Wait()
+    self.running = False
+    self.start.set()
+    self.thread.join()
@@ -52,6 +52,13 @@ class PlanarShadow(Appearance):
 
         return shadow_mat
 
+    def IsBlended(self):
+        return True
+
+    def TransformsGeometry(self):
+        # the shadow lies on the plane, not inside the object's bounds
+        return True
+
     def Load(self, st):
         # 1. Salva estado anterior
         self._saved_matrix = st.GetCurrentMatrix()
@@ -65,16 +72,18 @@ class PlanarShadow(Appearance):
         # Em vez de mover a matriz (offset), usamos o Polygon Offset do OpenGL.
         # Isso empurra os pixels da sombra para "trás" no depth buffer, ou traz para frente.
         # Factor = inclinação, Units = valor constante mínimo
-        glEnable(GL_POLYGON_OFFSET_FILL)
-        glPolygonOffset(-1.0, -1.0) 
+        gs = st.GetRenderState()
+        gs.Push()
+        gs.Enable(GL_POLYGON_OFFSET_FILL)
+        gs.PolygonOffset(-1.0, -1.0)
 
         # 4. Desativa efeitos de iluminação para a sombra ser "chapada"
         # Nota: Depende de como sua engine trata shaders. 
         # Idealmente você passaria uma flag para o shader usar cor sólida.
         # Exemplo genérico OpenGL fixo ou shader simples:
-        glDepthMask(GL_FALSE) # (Opcional) Evita que sombra escreva no Z-Buffer
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        gs.DepthMask(False) # (Opcional) Evita que sombra escreva no Z-Buffer
+        gs.Enable(GL_BLEND)
+        gs.BlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         
         # Se você tiver acesso ao shader aqui, setaria uma uniform "isShadow = true"
         # st.SetColor(0.0, 0.0, 0.0, 0.5) # Sombra preta 50% opaca
@@ -85,7 +94,5 @@ class PlanarShadow(Appearance):
             st.LoadMatrix(self._saved_matrix)
             self._saved_matrix = None
         
-        # Restaura Estados
-        glDisable(GL_POLYGON_OFFSET_FILL)
-        glDepthMask(GL_TRUE)
-        glDisable(GL_BLEND)
\ No newline at end of file
+        # Restaura Estados (só os que mudaram)
+        st.GetRenderState().Pop()
\ No newline at end of file
@@ -7,10 +7,11 @@ class PolygonOffset (Appearance):
     self.units = units
 
   def Load (self, st):
-    glPolygonOffset(self.factor,self.units)
-    glEnable(GL_POLYGON_OFFSET_FILL)
-    glEnable(GL_POLYGON_OFFSET_LINE)
+    gs = st.GetRenderState()
+    gs.Push()
+    gs.PolygonOffset(self.factor,self.units)
+    gs.Enable(GL_POLYGON_OFFSET_FILL)
+    gs.Enable(GL_POLYGON_OFFSET_LINE)
 
   def Unload (self, st):
-    glDisable(GL_POLYGON_OFFSET_LINE)
-    glDisable(GL_POLYGON_OFFSET_FILL)
+    st.GetRenderState().Pop()
@@ -1,30 +1,57 @@
 from OpenGL.GL import *
 from shape import *
 from grid import *
+from bounds import Bounds
+from vertexlayout import VertexLayout, UNORM16
+import numpy as np
+
+QUAD_LAYOUT = VertexLayout(((0,2,UNORM16),(3,2,UNORM16)))   # coord, texcoord
 
 class Quad (Shape):
-  def __init__ (self, nx = 1, ny = 1):
+  def __init__ (self, nx = 1, ny = 1, arena=None):
+    # quads with the same subdivision share their buffers
+    self.Share((Quad,nx,ny,arena),lambda: self.Build(nx,ny,arena))
+
+  def Build (self, nx, ny, arena):
     grid = Grid(nx,ny)
     self.nind = grid.IndexCount()
-    # create VAO
-    self.vao  = glGenVertexArrays(1)
-    glBindVertexArray(self.vao)
-    # create coord and texcoord buffers
-    id = glGenBuffers(2)
+    if arena:
+      # arena layout is 3D: z = 0 and constant normal and tangent
+      coords = grid.GetCoords()
+      self.bounds = Bounds(coords,2)
+      n = grid.VertexCount()
+      pos = np.zeros((n,3),dtype='float32')
+      pos[:,0:2] = coords.reshape(n,2)
+      self.geometry = arena.Allocate({0:pos,1:np.tile([0,0,1],n),2:np.tile([1,0,0],n),3:coords},
+                                     grid.GetIndices())
+      return
     coords = grid.GetCoords()
-    glBindBuffer(GL_ARRAY_BUFFER,id[0])
-    glBufferData(GL_ARRAY_BUFFER,coords.nbytes,coords,GL_STATIC_DRAW)
-    glVertexAttribPointer(0,2,GL_FLOAT,GL_FALSE,0,None)  # coord
-    glEnableVertexAttribArray(0)  
-    glVertexAttribPointer(3,2,GL_FLOAT,GL_FALSE,0,None)  # texcoord
-    glEnableVertexAttribArray(3)  
-    # create index buffer
-    indices = grid.GetIndices()
-    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER,id[1])
-    glBufferData(GL_ELEMENT_ARRAY_BUFFER,indices.nbytes,indices,GL_STATIC_DRAW)
+    self.bounds = Bounds(coords,2)
+    # grid coords are in [0,1]: the same values serve as texcoords
+    self.vao, self.buffers, self.itype = QUAD_LAYOUT.Upload({0:coords,3:coords},grid.GetIndices())
+
+  def GetTriangleCount (self):
+    return self.nind // 3
 
   def Draw (self, st):
+    if self.geometry:
+      self.geometry.Draw()
+      return
+    glBindVertexArray(self.vao)
+    glVertexAttrib3f(1,0,0,1) # constant for all vertices
+    glVertexAttrib3f(2,1,0,0) # constant for all vertices
+    glDrawElements(GL_TRIANGLES,self.nind,self.itype,None)
+
+  def IsInstanceable (self):
+    return True
+
+  def DrawInstanced (self, st, instances):
+    if self.geometry:
+      self.geometry.DrawInstanced(instances)
+      return
     glBindVertexArray(self.vao)
+    instances.Attach()
     glVertexAttrib3f(1,0,0,1) # constant for all vertices
     glVertexAttrib3f(2,1,0,0) # constant for all vertices
-    glDrawElements(GL_TRIANGLES,self.nind,GL_UNSIGNED_INT,None)
+    glDrawElementsInstanced(GL_TRIANGLES,self.nind,self.itype,None,instances.GetCount())
+    instances.Detach()
@@ -0,0 +1,115 @@
+from OpenGL.GL import *
+
+BLEND_FUNC = "blendfunc"
+COLOR_MASK = "colormask"
+DEPTH_MASK = "depthmask"
+POLYGON_OFFSET = "offset"
+
+# Shadow copy of the GL state changed while drawing: capabilities, blend
+# function, color and depth masks and polygon offset. Changes are recorded and sent to
+# GL by Flush, right before drawing, and only for values that differ from
+# what GL already has: a shadow restoring blending in Unload and the next
+# shadow enabling it again cost no GL call. A value not known yet is
+# queried once, the first time it is used. Push/Pop save and restore the
+# tracked values, so appearances and shapes undo their changes without
+# querying GL.
+class RenderState:
+  def __init__ (self):
+    self.values = {}    # capability or one of the keys above -> value
+    self.applied = {}   # values GL currently has
+    self.dirty = set()
+    self.stack = []     # values saved by Push, filled in on first change
+    self.requests = 0
+    self.issued = 0
+
+  def Invalidate (self):
+    # forget cached values, e.g. after GL calls made outside the tracker
+    self.values = {}
+    self.applied = {}
+    self.dirty = set()
+
+  def Get (self, key):
+    if key not in self.values:
+      self.values[key] = self.applied[key] = Query(key)
+    return self.values[key]
+
+  def Set (self, key, value):
+    old = self.Get(key)
+    self.requests += 1
+    if old == value:
+      return
+    for saved in self.stack:
+      saved.setdefault(key,old)
+    self.values[key] = value
+    self.dirty.add(key)
+
+  def Flush (self):
+    for key in self.dirty:
+      value = self.values[key]
+      if self.applied[key] != value:
+        Apply(key,value)
+        self.applied[key] = value
+        self.issued += 1
+    self.dirty.clear()
+
+  def IsEnabled (self, cap):
+    return self.Get(cap)
+
+  def Enable (self, cap):
+    self.Set(cap,True)
+
+  def Disable (self, cap):
+    self.Set(cap,False)
+
+  def BlendFunc (self, src, dst):
+    self.Set(BLEND_FUNC,(src,dst))
+
+  def ColorMask (self, r, g, b, a):
+    self.Set(COLOR_MASK,(bool(r),bool(g),bool(b),bool(a)))
+
+  def DepthMask (self, flag):
+    self.Set(DEPTH_MASK,bool(flag))
+
+  def PolygonOffset (self, factor, units):
+    self.Set(POLYGON_OFFSET,(float(factor),float(units)))
+
+  def Push (self):
+    self.stack.append({})
+
+  def Pop (self):
+    # restore what was changed since the matching Push
+    saved = self.stack.pop()
+    for key, value in saved.items():
+      self.Set(key,value)
+
+  def NewFrame (self):
+    self.requests = 0
+    self.issued = 0
+
+  def GetStats (self):
+    return {"gl_state_calls": self.issued,"gl_state_filtered": self.requests - self.issued}
+
+def Query (key):
+  if key == BLEND_FUNC:
+    return (int(glGetIntegerv(GL_BLEND_SRC_RGB)),int(glGetIntegerv(GL_BLEND_DST_RGB)))
+  if key == COLOR_MASK:
+    return tuple(bool(v) for v in glGetBooleanv(GL_COLOR_WRITEMASK))
+  if key == DEPTH_MASK:
+    return bool(glGetBooleanv(GL_DEPTH_WRITEMASK))
+  if key == POLYGON_OFFSET:
+    return (float(glGetFloatv(GL_POLYGON_OFFSET_FACTOR)),float(glGetFloatv(GL_POLYGON_OFFSET_UNITS)))
+  return bool(glIsEnabled(key))
+
+def Apply (key, value):
+  if key == BLEND_FUNC:
+    glBlendFunc(*value)
+  elif key == COLOR_MASK:
+    glColorMask(*(GL_TRUE if v else GL_FALSE for v in value))
+  elif key == DEPTH_MASK:
+    glDepthMask(GL_TRUE if value else GL_FALSE)
+  elif key == POLYGON_OFFSET:
+    glPolygonOffset(*value)
+  elif value:
+    glEnable(key)
+  else:
+    glDisable(key)
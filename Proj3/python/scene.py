@@ -1,8 +1,36 @@
+from drawrecord import DrawRecord
+from material import Material
+from culler import Culler
+from occlusion import OcclusionCuller
+from instancing import GroupInstances
+from indirect import GroupIndirect, IndirectSupported
+from bakedmesh import BakedMesh
+from node import Node
+from transformstore import TransformHierarchy
 
 class Scene:
   def __init__ (self, root):
     self.root = root
     self.engines = []
+    self.state = None
+    self.nodes = []      # all nodes in pre-order (parents first)
+    self.records = []    # flat list of draw records
+    self.queue = []      # records in submission order
+    self.sorted = False
+    self.instancing = False
+    self.baking = False
+    self.indirect = None   # (source shader, indirect shader)
+    self.batched = False
+    self.store = None
+    self.hierarchy = None  # TransformHierarchy, when batching transforms
+    self.baked = []      # BakedMesh objects of the current compilation
+    self.bakekeys = []   # (node, stamp) of the nodes merged into them
+    self.culling = False
+    self.culler = None
+    self.occlusion = None
+    self.occlusion_threshold = None
+    self.revision = None
+    self.stats = {}
 
   def GetRoot (self):
     return self.root
@@ -10,11 +38,317 @@ class Scene:
   def AddEngine (self, engine):
     self.engines.append(engine)
 
+  def GetEngines (self):
+    return self.engines
+
   def Update (self, dt):
     for e in self.engines:
       e.Update(dt)
 
-  def Render (self, camera):
+  def SetSorted (self, flag):
+    # submit draws grouped by program, texture set and material
+    self.sorted = flag
+    self.Invalidate()
+
+  def IsSorted (self):
+    return self.sorted
+
+  def SetInstancing (self, flag):
+    # draw records sharing shape, shader and appearances with one
+    # instanced call, if the shader takes per-instance matrices
+    self.instancing = flag
+    self.Invalidate()
+
+  def BakeStatic (self, flag=True):
+    # merge shapes of frozen subtrees sharing shader and appearances into
+    # world-space meshes; rebaked when a frozen node moves
+    self.baking = flag
+    self.Invalidate()
+
+  def SetIndirect (self, source, shader):
+    # draw the material-only records of 'source' with one multi-draw
+    # indirect call using 'shader'; ignored below GL 4.3
+    self.indirect = (source,shader) if shader else None
+    self.Invalidate()
+
+  def SetTransformStore (self, store, flag=True):
+    # compute world matrices level by level with batched numpy products;
+    # transforms created by 'store' are read from it without copies
+    self.store = store
+    self.batched = flag
+    self.Invalidate()
+
+  def SetCulling (self, flag):
+    # skip subtrees whose bounds are outside the camera frustum
+    self.culling = flag
+    self.Invalidate()
+
+  def GetCuller (self):
+    return self.culler
+
+  def SetOcclusion (self, flag, threshold=4096):
+    # test records with at least 'threshold' triangles with occlusion
+    # queries, using the results of the previous frame
+    self.occlusion_threshold = threshold if flag else None
+    self.Invalidate()
+
+  def GetStats (self):
+    return self.stats
+
+  def Invalidate (self):
+    # force a rebuild, e.g. after editing node lists directly
+    self.revision = None
+
+  def Compile (self):
+    # per-instance and indirect buffers of the previous queue are rebuilt below
+    for rec in self.queue:
+      if rec.instances:
+        rec.instances.Delete()
+      if rec.indirect:
+        rec.indirect.Delete()
+    if self.occlusion:
+      self.occlusion.Delete()
+    self.nodes = []
+    self.records = []
+    unbounded = []
+    frozen = []
+    stack = [(self.root,None,(),False)]
+    while stack:
+      node, shader, apps, static = stack.pop()
+      shader = node.GetShader() or shader
+      apps = apps + tuple(node.apps)
+      static = static or node.IsFrozen()
+      index = len(self.nodes)
+      self.nodes.append(node)
+      unbounded.append(any(app.TransformsGeometry() for app in apps))
+      if node.shps:
+        if not shader:
+          raise RuntimeError("Shader not defined")
+        self.records.append(DrawRecord(node,shader,apps,tuple(node.shps),index))
+        frozen.append(static)
+      for child in reversed(node.nodes):
+        stack.append((child,shader,apps,static))
+    if self.batched:
+      self.hierarchy = TransformHierarchy(self.nodes,self.store)
+    else:
+      self.hierarchy = None
+    for mesh in self.baked:
+      mesh.Release()
+    self.baked = []
+    self.bakekeys = []
+    if self.baking:
+      self.records = self.BakeRecords(self.records,frozen)
+    if self.culling:
+      self.culler = Culler(self.nodes,unbounded)
+    else:
+      self.culler = None
+    batch = self.records
+    if self.indirect and IndirectSupported():
+      batch = GroupIndirect(batch,*self.indirect)
+    if self.instancing:
+      batch = GroupInstances(batch)
+    if self.occlusion_threshold is not None:
+      tested = [rec for rec in batch if not rec.baked and not rec.indirect]
+      self.occlusion = OcclusionCuller(tested,self.occlusion_threshold)
+    else:
+      self.occlusion = None
+    if self.sorted:
+      self.queue = SortRecords(batch)
+    else:
+      self.queue = batch
+    unsorted = CountSwitches(self.records)
+    switches = CountSwitches(self.queue)
+    self.stats["draws"] = len(self.queue)
+    self.stats["switches"] = switches
+    self.stats["switches_saved"] = unsorted - switches
+    self.revision = self.root.GetRevision()
+
+  def BakeRecords (self, records, frozen):
+    # replace frozen records sharing shader and appearances by one record
+    # drawing their merged geometry, placed where the first of them was
+    self.UpdateWorldMatrices()
+    groups = {}
+    order = []
+    for rec, static in zip(records,frozen):
+      if static and IsBakeable(rec):
+        key = (rec.shader,rec.apps,rec.shps[0].geometry.GetArena())
+        if key not in groups:
+          groups[key] = []
+          order.append(key)
+        groups[key].append(rec)
+      else:
+        order.append(rec)
+    result = []
+    merged = 0
+    for item in order:
+      if isinstance(item,DrawRecord):
+        result.append(item)
+        continue
+      group = groups[item]
+      if len(group) == 1 and len(group[0].shps) == 1:
+        result.extend(group)
+        continue
+      shader, apps, arena = item
+      parts = [(rec.node.world,shp.geometry) for rec in group for shp in rec.shps]
+      mesh = BakedMesh(arena,parts)
+      self.baked.append(mesh)
+      self.bakekeys.extend((rec.node,rec.node.stamp) for rec in group)
+      merged += len(group)
+      # identity world matrix; culled with the root
+      baked = DrawRecord(Node(),shader,apps,(mesh,),0)
+      baked.baked = True
+      result.append(baked)
+    self.stats["baked"] = merged
+    return result
+
+  def IsBakeStale (self):
+    # a frozen node has moved since its geometry was baked
+    for node, stamp in self.bakekeys:
+      if node.stamp != stamp:
+        return True
+    return False
+
+  def GetRecords (self):
+    if self.revision != self.root.GetRevision():
+      self.Compile()
+    return self.queue
+
+  def UpdateWorldMatrices (self):
+    if self.hierarchy:
+      self.hierarchy.Update()
+      return
+    self.root.GetModelMatrix()
+    for i in range(1,len(self.nodes)):
+      self.nodes[i].UpdateWorldMatrix()
+
+  def Render (self, camera, update=True):
+    # update=False when the world matrices were already published, e.g.
+    # by a Pipeline, which also recompiles while its worker is idle: the
+    # queue is then drawn as is
     from state import State
-    st = State(camera)
-    self.root.Render(st)
+    records = self.GetRecords() if update else self.queue
+    if not self.state:
+      self.state = State(camera)
+    st = self.state
+    st.SetCamera(camera)
+    st.NewFrame()
+    if update:
+      self.UpdateWorldMatrices()
+      if self.bakekeys and self.IsBakeStale():
+        self.Compile()
+        records = self.queue
+    visible = None
+    visarray = None
+    culled = 0
+    instances = 0
+    indirect = 0
+    if self.culler:
+      visarray = self.culler.Cull(camera)
+      visible = visarray.tolist()
+    occ = self.occlusion
+    if occ:
+      occ.NewFrame()
+    shader = None
+    for rec in records:
+      inst = rec.instances
+      mdi = rec.indirect
+      if inst:
+        count = inst.Update(visarray)
+        if count == 0:
+          culled += 1
+          continue
+        instances += count
+      elif mdi:
+        count = mdi.Update(visarray)
+        if count == 0:
+          culled += 1
+          continue
+        indirect += count
+      elif visible and not visible[rec.index]:
+        culled += 1
+        continue
+      tested = occ and occ.IsTested(rec)
+      if tested and not occ.BeginDraw(rec):
+        continue
+      if rec.shader is not shader:
+        shader = rec.shader
+        st.BindShader(shader)
+        if shader.GetLight():
+          shader.GetLight().Load(st)
+      st.LoadMatrix(rec.node.world)
+      for app in rec.apps:
+        app.Load(st)
+      st.LoadMatrices()
+      if inst:
+        for shp in rec.shps:
+          shp.DrawInstanced(st,inst)
+      elif mdi:
+        mdi.Draw()
+      else:
+        for shp in rec.shps:
+          shp.Draw(st)
+      if tested:
+        occ.EndDraw(rec)
+      for app in reversed(rec.apps):
+        app.Unload(st)
+    st.UnbindShader()
+    st.GetRenderState().Flush()
+    if occ:
+      occ.IssueQueries(st,visible)
+      self.stats.update(occ.GetStats())
+    self.stats["culled"] = culled
+    self.stats["instances"] = instances
+    self.stats["indirect"] = indirect
+    self.stats.update(st.GetStats())
+
+
+def IsBakeable (rec):
+  if rec.shader.SupportsInstancing():
+    return False   # takes its model matrix per instance
+  if any(app.TransformsGeometry() or app.IsBlended() for app in rec.apps):
+    return False
+  if not all(shp.IsBakeable() for shp in rec.shps):
+    return False
+  arenas = set(shp.geometry.GetArena() for shp in rec.shps)
+  return len(arenas) == 1
+
+# state keys of a record: program, bound textures and materials
+def StateKeys (rec):
+  texs = tuple(app for app in rec.apps if hasattr(app,"GetTexId"))
+  mats = tuple(app for app in rec.apps if isinstance(app,Material))
+  return (rec.shader,texs,mats)
+
+def RecordPass (rec):
+  if any(shp.IsBackground() for shp in rec.shps):
+    return 0
+  if any(app.IsBlended() for app in rec.apps):
+    return 2
+  return 1
+
+# order opaque records by state; background and blended records
+# keep the author order, before and after the opaque ones
+def SortRecords (records):
+  ranks = [{},{},{}]
+  def rank (i, key):
+    return ranks[i].setdefault(key,len(ranks[i]))
+  def sortkey (item):
+    i, rec = item
+    p = RecordPass(rec)
+    if p != 1:
+      return (p,0,0,0,i)
+    shd, texs, mats = StateKeys(rec)
+    return (p,rank(0,shd),rank(1,texs),rank(2,mats),i)
+  items = sorted(enumerate(records),key=sortkey)
+  return [rec for i, rec in items]
+
+# number of program, texture set and material changes when drawing in order
+def CountSwitches (records):
+  count = 0
+  prev = (None,None,None)
+  for rec in records:
+    keys = StateKeys(rec)
+    for a, b in zip(keys,prev):
+      if a != b:
+        count += 1
+    prev = keys
+  return count
@@ -0,0 +1,58 @@
+# Steps the engines of a scene at fixed rates, decoupled from the frame
+# rate. Frame time is accumulated per engine and consumed in fixed steps;
+# at most 'max_steps' steps run per frame, and time beyond that is dropped
+# so a slow frame cannot snowball. After stepping, each engine gets the
+# interpolation alpha of its own clock, and GetAlpha returns the one of the
+# default rate for the renderer.
+class Scheduler:
+  def __init__ (self, scene, rate=60.0, max_steps=5):
+    self.scene = scene
+    self.rate = rate
+    self.max_steps = max_steps
+    self.rates = {}     # engine -> rate set with SetRate
+    self.clocks = {}    # engine -> accumulated time
+    self.accumulator = 0.0
+    self.alpha = 0.0
+    self.stats = {"steps": 0,"dropped": 0.0}
+
+  def SetRate (self, engine, rate):
+    self.rates[engine] = rate
+
+  def GetRate (self, engine=None):
+    if engine is None:
+      return self.rate
+    rate = self.rates.get(engine) or engine.GetRate()
+    return rate or self.rate
+
+  def GetAlpha (self):
+    return self.alpha
+
+  def GetStats (self):
+    return self.stats
+
+  def Advance (self, dt):
+    # consume a frame of 'dt' seconds; returns the interpolation alpha
+    self.stats = {"steps": 0,"dropped": 0.0}
+    step = 1.0 / self.rate
+    self.accumulator, steps, dropped = Consume(self.accumulator + dt,step,self.max_steps)
+    self.alpha = self.accumulator / step
+    for engine in self.scene.GetEngines():
+      estep = 1.0 / self.GetRate(engine)
+      clock = self.clocks.get(engine,0.0) + dt
+      clock, n, lost = Consume(clock,estep,self.max_steps)
+      for i in range(n):
+        engine.Update(estep)
+      self.clocks[engine] = clock
+      engine.Interpolate(clock / estep)
+      self.stats["steps"] += n
+      self.stats["dropped"] += lost
+    return self.alpha
+
+# number of whole steps in 'acc', capped; returns the remainder, the steps
+# and the time dropped by the cap
+def Consume (acc, step, max_steps):
+  n = int(acc / step)
+  if n > max_steps:
+    dropped = (n - max_steps) * step
+    return acc - n*step, max_steps, dropped
+  return acc - n*step, n, 0.0
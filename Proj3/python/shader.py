@@ -3,6 +3,7 @@ import numpy as np
 import glm
 
 import shaderutl as sutl
+from frameblock import FRAME_BLOCK_NAME, FRAME_BLOCK_BINDING
 
 # read file to a string
 class Shader:
@@ -12,6 +13,10 @@ class Shader:
     self.light = light
     self.space = space
     self.pid = None
+    self.uniforms = {}
+    self.frameblock = False
+    self.instancing = False
+    self.instance_color = False
 
   def AttachVertexShader (self, filename):
     self.shaders.append(sutl.create_shader(GL_VERTEX_SHADER,filename))
@@ -28,6 +33,42 @@ class Shader:
   
   def Link (self):
     self.pid = sutl.create_program(*self.shaders)
+    self.ReflectUniforms()
+
+  def ReflectUniforms (self):
+    # name -> [location, setter, last uploaded value]
+    self.uniforms = {}
+    n = glGetProgramiv(self.pid,GL_ACTIVE_UNIFORMS)
+    for i in range(0,n):
+      name, size, tp = glGetActiveUniform(self.pid,i)
+      name = name.decode()
+      loc = glGetUniformLocation(self.pid,name)
+      if loc < 0:
+        continue  # member of a uniform block
+      if name.endswith("[0]"):
+        name = name[:-3]
+      self.uniforms[name] = [loc,SETTERS.get(tp,SetAny),None]
+    # bind the per-frame camera/light block, if the program declares it
+    idx = glGetUniformBlockIndex(self.pid,FRAME_BLOCK_NAME)
+    self.frameblock = idx != GL_INVALID_INDEX
+    if self.frameblock:
+      glUniformBlockBinding(self.pid,idx,FRAME_BLOCK_BINDING)
+    # per-instance attributes (see instancing.py)
+    self.instancing = glGetAttribLocation(self.pid,"Minst") >= 0
+    self.instance_color = glGetAttribLocation(self.pid,"Icolor") >= 0
+
+  def HasFrameBlock (self):
+    return self.frameblock
+
+  def SupportsInstancing (self):
+    return self.instancing
+
+  def HasInstanceColor (self):
+    return self.instance_color
+
+  def GetUniformLocation (self, varname):
+    entry = self.uniforms.get(varname)
+    return entry[0] if entry else -1
 
   def GetLight (self):
     return self.light
@@ -40,34 +81,14 @@ class Shader:
     glUseProgram(self.pid)
 
   def SetUniform (self, varname, x):
-    loc = glGetUniformLocation(self.pid,varname)
-    tp = type(x)
-    if tp == int:
-      glUniform1i(loc,x)
-    elif tp == float:
-      glUniform1f(loc,x)
-    elif tp == glm.vec3:
-      glUniform3fv(loc,1,glm.value_ptr(x))
-    elif tp == glm.vec4:
-      glUniform4fv(loc,1,glm.value_ptr(x))
-    elif tp == glm.mat4x4:
-      glUniformMatrix4fv(loc,1,GL_FALSE,glm.value_ptr(x))
-    elif tp == list:
-      tpe = type(x[0])
-      if tpe == int:
-        glUniform1iv(loc,len(x),np.array(x,dtype='int'))
-      elif tpe == float:
-        glUniform1fv(loc,len(x),np.array(x,dtype='float'))
-      elif tpe == glm.vec3:
-        glUniform3fv(loc,len(x),np.array(x,dtype='float'))
-      elif tpe == glm.vec4:
-        glUniform4fv(loc,len(x),np.array(x,dtype='float'))
-      elif tpe == glm.mat4x4:
-        glUniformMatrix4fv(loc,len(x),GL_FALSE,np.array(x,dtype='float'))
-      else:
-        raise SystemError("Type not supported in list in Shader.SetUniform: " + str(tpe))
-    else:
-      raise SystemError("Type not supported in Shader.SetUniform: " + str(tp))
+    entry = self.uniforms.get(varname)
+    if not entry:
+      return    # not an active uniform of this program
+    if type(x) != list:
+      if entry[2] == x:
+        return  # value already uploaded
+      entry[2] = CopyValue(x)
+    entry[1](entry[0],x)
     
   def ActiveTexture (self, varname):
     self.SetUniform(varname,self.texunit)
@@ -88,3 +109,83 @@ class Shader:
   def Unload (self, st):
     st.PopShader()
 
+def CopyValue (x):
+  tp = type(x)
+  if tp == int or tp == float or tp == bool:
+    return x
+  return tp(x)   # glm values are mutable, keep a snapshot
+
+# setters for the uniform types used by the shaders; each one also
+# accepts a list of values for array uniforms
+def ScalarSetter (func, funcv, dtype):
+  def setter (loc, x):
+    if type(x) == list:
+      funcv(loc,len(x),np.array(x,dtype=dtype))
+    else:
+      func(loc,x)
+  return setter
+
+def VectorSetter (funcv):
+  def setter (loc, x):
+    if type(x) == list:
+      funcv(loc,len(x),np.array(x,dtype='float32'))
+    else:
+      funcv(loc,1,glm.value_ptr(x))
+  return setter
+
+def MatrixSetter (funcv):
+  def setter (loc, x):
+    if type(x) == list:
+      funcv(loc,len(x),GL_TRUE,np.array(x,dtype='float32'))
+    else:
+      funcv(loc,1,GL_FALSE,glm.value_ptr(x))
+  return setter
+
+# fallback for types without a dedicated setter: dispatch on the value
+def SetAny (loc, x):
+  tp = type(x)
+  if tp == int or tp == bool:
+    glUniform1i(loc,x)
+  elif tp == float:
+    glUniform1f(loc,x)
+  elif tp == glm.vec3:
+    glUniform3fv(loc,1,glm.value_ptr(x))
+  elif tp == glm.vec4:
+    glUniform4fv(loc,1,glm.value_ptr(x))
+  elif tp == glm.mat4x4:
+    glUniformMatrix4fv(loc,1,GL_FALSE,glm.value_ptr(x))
+  elif tp == list:
+    tpe = type(x[0])
+    if tpe == int:
+      glUniform1iv(loc,len(x),np.array(x,dtype='int32'))
+    elif tpe == float:
+      glUniform1fv(loc,len(x),np.array(x,dtype='float32'))
+    elif tpe == glm.vec3:
+      glUniform3fv(loc,len(x),np.array(x,dtype='float32'))
+    elif tpe == glm.vec4:
+      glUniform4fv(loc,len(x),np.array(x,dtype='float32'))
+    elif tpe == glm.mat4x4:
+      glUniformMatrix4fv(loc,len(x),GL_TRUE,np.array(x,dtype='float32'))
+    else:
+      raise SystemError("Type not supported in list in Shader.SetUniform: " + str(tpe))
+  else:
+    raise SystemError("Type not supported in Shader.SetUniform: " + str(tp))
+
+SET_FLOAT = ScalarSetter(glUniform1f,glUniform1fv,'float32')
+SET_INT = ScalarSetter(glUniform1i,glUniform1iv,'int32')
+SETTERS = {
+  GL_FLOAT: SET_FLOAT,
+  GL_FLOAT_VEC2: VectorSetter(glUniform2fv),
+  GL_FLOAT_VEC3: VectorSetter(glUniform3fv),
+  GL_FLOAT_VEC4: VectorSetter(glUniform4fv),
+  GL_FLOAT_MAT3: MatrixSetter(glUniformMatrix3fv),
+  GL_FLOAT_MAT4: MatrixSetter(glUniformMatrix4fv),
+  GL_INT: SET_INT,
+  GL_BOOL: SET_INT,
+  GL_SAMPLER_1D: SET_INT,
+  GL_SAMPLER_2D: SET_INT,
+  GL_SAMPLER_3D: SET_INT,
+  GL_SAMPLER_CUBE: SET_INT,
+  GL_SAMPLER_2D_SHADOW: SET_INT,
+  GL_SAMPLER_BUFFER: SET_INT,
+}
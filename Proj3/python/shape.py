@@ -1,2 +1,54 @@
+from OpenGL.GL import *
+from geometryregistry import registry
+
 class Shape:
-  pass
\ No newline at end of file
+  bounds = None     # Bounds computed at construction, if known
+  geometry = None   # GeometryRange, if allocated from an arena
+  key = None        # registry key, if the buffers are shared
+
+  def Share (self, key, build):
+    # adopt the buffers registered under 'key', calling 'build' to create
+    # them (setting this shape's attributes) the first time
+    def create ():
+      build()
+      return dict(vars(self))
+    self.__dict__.update(registry.Acquire(key,create,type(self).DeleteBuffers))
+    self.key = key
+
+  def Release (self):
+    # drop this shape's reference to shared buffers
+    if self.key is not None:
+      key, self.key = self.key, None
+      registry.Release(key)
+
+  def __del__ (self):
+    self.Release()
+
+  @staticmethod
+  def DeleteBuffers (attrs):
+    # delete the buffers described by the attributes of a shared shape
+    if attrs.get("geometry"):
+      attrs["geometry"].Free()
+    elif attrs.get("vao"):
+      glDeleteVertexArrays(1,[attrs["vao"]])
+      glDeleteBuffers(len(attrs["buffers"]),attrs["buffers"])
+
+  def GetBounds (self):
+    return self.bounds
+
+  def GetTriangleCount (self):
+    return 0
+
+  def IsInstanceable (self):
+    return False
+
+  def DrawInstanced (self, st, instances):
+    raise RuntimeError("Shape does not support instancing")
+
+  def IsBakeable (self):
+    # geometry in an arena can be merged into static batches
+    return self.geometry is not None
+
+  def IsBackground (self):
+    # background shapes are drawn first, in author order
+    return False
@@ -1,10 +1,13 @@
 from OpenGL.GL import * 
 from shape import *
+from vertexlayout import VertexLayout, FLOAT
 import glm
 import numpy as np
 
+SKYBOX_LAYOUT = VertexLayout(((0,3,FLOAT),))   # coord
+
 class SkyBox (Shape):
-  def __init__ (self):
+  def __init__ (self, arena=None):
     coords = np.array([
       -1.0,  1.0, -1.0,
       -1.0, -1.0, -1.0,
@@ -48,17 +51,19 @@ class SkyBox (Shape):
       -1.0, -1.0,  1.0,
       1.0, -1.0,  1.0
     ], dtype='float32')
-    
-    # create VAO
-    self.vao = glGenVertexArrays(1)
-    glBindVertexArray(self.vao)
-    # create coord and normal buffer
-    id = glGenBuffers(1)
-    glBindBuffer(GL_ARRAY_BUFFER,id)
-    glBufferData(GL_ARRAY_BUFFER,coords.nbytes,coords,GL_STATIC_DRAW)
-    glVertexAttribPointer(0,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(0) 
+    if arena:
+      self.geometry = arena.Allocate({0:coords},np.arange(36,dtype='uint32'))
+      return
+    self.vao, self.buffers, itype = SKYBOX_LAYOUT.Upload({0:coords})
+
+  def IsBackground (self):
+    return True
+
+  def IsBakeable (self):
+    return False
 
+  def GetBounds (self):
+    return None   # always drawn around the camera
 
   def Draw (self, st):
   # draw at camera position
@@ -69,8 +74,14 @@ class SkyBox (Shape):
     st.PushMatrix()
     st.LoadMatrix(M)
     st.LoadMatrices()    # update loaded matrices
-    glDepthMask(GL_FALSE)
-    glBindVertexArray(self.vao)
-    glDrawArrays(GL_TRIANGLES,0,36)
-    glDepthMask(GL_TRUE)
+    gs = st.GetRenderState()
+    gs.Push()
+    gs.DepthMask(False)
+    gs.Flush()
+    if self.geometry:
+      self.geometry.Draw()
+    else:
+      glBindVertexArray(self.vao)
+      glDrawArrays(GL_TRIANGLES,0,36)
+    gs.Pop()
     st.PopMatrix()
@@ -1,52 +1,60 @@
 from OpenGL.GL import *
 from shape import Shape
 from grid import Grid
+from bounds import Bounds
+from vertexlayout import UNIT_LAYOUT
 import numpy as np
 import math
 
 class Sphere(Shape):
-  def __init__(self, nstack=64, nslice=64):
+  def __init__(self, nstack=64, nslice=64, arena=None):
+    # spheres with the same tessellation share their buffers
+    self.Share((Sphere,nstack,nslice,arena),lambda: self.Build(nstack,nslice,arena))
+
+  def Build (self, nstack, nslice, arena):
     grid = Grid(nstack,nslice)
     self.nind = grid.IndexCount()
-    coord = np.empty(3*grid.VertexCount(), dtype = 'float32')
-    tangent = np.empty(3*grid.VertexCount(), dtype = 'float32')
     texcoord = grid.GetCoords()
-    nc = 0
-    for i in range(0,2*grid.VertexCount(),2):
-      theta = texcoord[i+0]*2*math.pi
-      phi = texcoord[i+1]*math.pi
-      coord[nc+0] = math.sin(theta) * math.sin(math.pi-phi)
-      coord[nc+1] = math.cos(math.pi-phi)
-      coord[nc+2] = math.cos(theta) * math.sin(math.pi-phi)
-      tangent[nc+0] = math.cos(theta)
-      tangent[nc+1] = 0
-      tangent[nc+2] = -math.sin(theta)
-      nc += 3
-    
-    # create VAO
-    self.vao = glGenVertexArrays(1)
-    glBindVertexArray(self.vao)
-    # create coord buffer
-    id = glGenBuffers(4)
-    glBindBuffer(GL_ARRAY_BUFFER,id[0])
-    glBufferData(GL_ARRAY_BUFFER,coord.nbytes,coord,GL_STATIC_DRAW)
-    glVertexAttribPointer(0,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(0)
-    glVertexAttribPointer(1,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(1)
-    glBindBuffer(GL_ARRAY_BUFFER,id[1])
-    glBufferData(GL_ARRAY_BUFFER,tangent.nbytes,tangent,GL_STATIC_DRAW)
-    glVertexAttribPointer(2,3,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(2)
-    glBindBuffer(GL_ARRAY_BUFFER,id[2])
-    glBufferData(GL_ARRAY_BUFFER,texcoord.nbytes,texcoord,GL_STATIC_DRAW)
-    glVertexAttribPointer(3,2,GL_FLOAT,GL_FALSE,0,None) 
-    glEnableVertexAttribArray(3)
-    # create index buffer
-    indices = grid.GetIndices()
-    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER,id[3])
-    glBufferData(GL_ELEMENT_ARRAY_BUFFER,indices.nbytes,indices,GL_STATIC_DRAW)
+    coord, tangent = SphereGeometry(texcoord)
+    self.bounds = Bounds(coord)
+    if arena:
+      self.geometry = arena.Allocate({0:coord,1:coord,2:tangent,3:texcoord},grid.GetIndices())
+      return
+
+    self.vao, self.buffers, self.itype = UNIT_LAYOUT.Upload(
+      {0:coord,1:coord,2:tangent,3:texcoord},grid.GetIndices())
+
+  def GetTriangleCount (self):
+    return self.nind // 3
 
   def Draw (self, st):
+    if self.geometry:
+      self.geometry.Draw()
+      return
     glBindVertexArray(self.vao)
-    glDrawElements(GL_TRIANGLES,self.nind,GL_UNSIGNED_INT,None)
+    glDrawElements(GL_TRIANGLES,self.nind,self.itype,None)
+
+  def IsInstanceable (self):
+    return True
+
+  def DrawInstanced (self, st, instances):
+    if self.geometry:
+      self.geometry.DrawInstanced(instances)
+      return
+    glBindVertexArray(self.vao)
+    instances.Attach()
+    glDrawElementsInstanced(GL_TRIANGLES,self.nind,self.itype,None,instances.GetCount())
+    instances.Detach()
+
+# unit sphere positions (= normals) and tangents at the grid texcoords;
+# angles keep the single precision of the texcoords, trig is in double
+def SphereGeometry (texcoord):
+  st = texcoord.reshape(-1,2)
+  theta = (st[:,0]*2*np.float32(math.pi)).astype('float64')
+  phi = (np.float32(math.pi) - st[:,1]*np.float32(math.pi)).astype('float64')
+  sint = np.sin(theta)
+  cost = np.cos(theta)
+  sinp = np.sin(phi)
+  coord = np.stack((sint*sinp,np.cos(phi),cost*sinp),axis=-1)
+  tangent = np.stack((cost,np.zeros_like(cost),-sint),axis=-1)
+  return coord.astype('float32').reshape(-1), tangent.astype('float32').reshape(-1)
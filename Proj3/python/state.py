@@ -1,11 +1,16 @@
 import glm
 from OpenGL.GL import *
+from frameblock import FrameBlock
+from renderstate import RenderState
 
 class State:
   def __init__ (self, camera):
     self.camera = camera
     self.shader = []
     self.stack = [glm.mat4(1.0)]
+    self.frameblock = None
+    self.glstate = RenderState()   # capabilities, blending, depth mask, offset
+    self.stats = {}     # per-frame counters filled while drawing
     glUseProgram(0) # compatibility profile as default
 
   def PushShader (self, shd):
@@ -19,11 +24,45 @@ class State:
     else:
       self.shader[-1].UseProgram()
   
+  def BindShader (self, shd):
+    # replace the current shader (used by flat render lists)
+    if self.shader:
+      self.shader[-1] = shd
+    else:
+      self.shader.append(shd)
+    shd.UseProgram()
+
+  def UnbindShader (self):
+    self.shader = []
+    glUseProgram(0)
+  
   def GetShader (self):
     if not self.shader:
-      error("Shader not defined")
+      raise RuntimeError("Shader not defined")
     return self.shader[-1]
 
+  def SetCamera (self, camera):
+    self.camera = camera
+
+  def GetFrameBlock (self):
+    if not self.frameblock:
+      self.frameblock = FrameBlock()
+    return self.frameblock
+
+  def GetRenderState (self):
+    return self.glstate
+
+  def GetStats (self):
+    self.stats.update(self.glstate.GetStats())
+    return self.stats
+
+  def NewFrame (self):
+    # per-frame data is rewritten on its next use
+    self.stats = {}
+    self.glstate.NewFrame()
+    if self.frameblock:
+      self.frameblock.NewFrame()
+
   def GetCamera (self):
     return self.camera
 
@@ -43,8 +82,14 @@ class State:
     return self.stack[-1]
 
   def LoadMatrices (self):
-    # set matrices
+    # set matrices and pending render state
+    self.glstate.Flush()
     shd = self.GetShader()
+    if shd.HasFrameBlock():
+      # view and projection come from the frame block
+      self.GetFrameBlock().LoadCamera(self.camera)
+      shd.SetUniform("M",self.GetCurrentMatrix())
+      return
     mvp = self.camera.GetProjMatrix() * self.camera.GetViewMatrix() * self.GetCurrentMatrix()
     mv = self.GetCurrentMatrix()      # to global space
     if shd.GetLightingSpace() == "camera":
@@ -3,21 +3,37 @@ import glm
 class Transform:
   def __init__ (self):
     self.mat = glm.mat4(1.0)
+    self.version = 0   # incremented whenever the matrix changes
+
+  def Touch (self):
+    self.version += 1
+
+  def GetVersion (self):
+    return self.version
 
   def LoadIdentity (self):
     self.mat = glm.mat4(1.0)
+    self.Touch()
   
+  def SetMatrix (self, mat):
+    self.mat = glm.mat4(mat)
+    self.Touch()
+
   def MultMatrix (self, mat):
     self.mat *= mat
+    self.Touch()
   
   def Translate (self, x, y, z):
     self.mat = glm.translate(self.mat,glm.vec3(x,y,z))
+    self.Touch()
   
   def Scale (self, x, y, z):
     self.mat = glm.scale(self.mat,glm.vec3(x,y,z))
+    self.Touch()
   
   def Rotate (self, angle, x, y, z):
     self.mat = glm.rotate(self.mat,glm.radians(angle),glm.vec3(x,y,z))
+    self.Touch()
   
   def GetMatrix (self):
     return self.mat
@@ -0,0 +1,132 @@
+import glm
+import numpy as np
+from transform import Transform
+
+IDENTITY = np.identity(4,dtype='float32')
+
+# Local matrices of many transforms in one contiguous (N,4,4) float32 array
+# (row-major, as np.array(glm.mat4)). Transforms created by the store are
+# views into it and keep the Transform interface.
+class TransformStore:
+  def __init__ (self, capacity=64):
+    self.local = np.tile(IDENTITY,(capacity,1,1))
+    self.versions = np.zeros(capacity,dtype='int64')   # per transform
+    self.count = 0
+
+  def Create (self):
+    if self.count == len(self.local):
+      self.local = np.concatenate([self.local,np.tile(IDENTITY,(len(self.local),1,1))])
+      self.versions = np.concatenate([self.versions,np.zeros(len(self.versions),dtype='int64')])
+    trf = StoredTransform(self,self.count)
+    self.count += 1
+    return trf
+
+  def GetCount (self):
+    return self.count
+
+  def GetLocalMatrices (self):
+    return self.local[:self.count]
+
+  def Touch (self, slots):
+    # bump the versions of the transforms at 'slots' (no repeats)
+    self.versions[slots] += 1
+
+class StoredTransform (Transform):
+  def __init__ (self, store, index):
+    self.store = store
+    self.index = index
+
+  def GetIndex (self):
+    return self.index
+
+  # the version lives in the store, so batched updates can bump it
+  def Touch (self):
+    self.store.versions[self.index] += 1
+
+  def GetVersion (self):
+    return int(self.store.versions[self.index])
+
+  # the inherited methods read and write 'mat', which lives in the store
+  @property
+  def mat (self):
+    return glm.mat4(self.store.local[self.index])
+
+  @mat.setter
+  def mat (self, m):
+    self.store.local[self.index] = m
+
+# World matrices of a compiled node list (pre-order, parents first),
+# computed level by level with batched matmuls. Nodes whose transform is a
+# view into 'store' read their local matrix from it directly; other
+# transforms are copied in when their version changes. Only nodes whose
+# world matrix changed get a new glm matrix and stamp.
+class TransformHierarchy:
+  def __init__ (self, nodes, store=None):
+    n = len(nodes)
+    self.nodes = nodes
+    self.store = store
+    position = dict((id(node),i) for i, node in enumerate(nodes))
+    self.parent = np.array([position.get(id(node.GetParent()),-1) for node in nodes],dtype='int64')
+    depth = np.zeros(n,dtype='int64')
+    for i in range(1,n):
+      if self.parent[i] >= 0:
+        depth[i] = depth[self.parent[i]] + 1
+    self.levels = [np.nonzero(depth == d)[0] for d in range(int(depth.max())+1 if n else 0)]
+    slots = []
+    self.others = []   # (node position, transform) not in the store
+    for i, node in enumerate(nodes):
+      trf = node.trf
+      if isinstance(trf,StoredTransform) and trf.store is store:
+        slots.append(trf.GetIndex())
+      else:
+        slots.append(-1)
+        if trf:
+          self.others.append((i,trf))
+    self.slots = np.array(slots,dtype='int64')
+    self.stored = np.nonzero(self.slots >= 0)[0]
+    self.local = np.tile(IDENTITY,(n,1,1))
+    # double-buffered world matrices: 'world' is what the nodes hold,
+    # Compute writes into the other buffer
+    self.buffers = [np.zeros((n,4,4),dtype='float32'),np.zeros((n,4,4),dtype='float32')]
+    self.world = self.buffers[0]
+    self.versions = [None] * len(self.others)
+
+  def Update (self):
+    return self.Sync(self.Compute())
+
+  def Compute (self):
+    # world matrices from the current transforms; does not touch the
+    # nodes, so it may run on another thread while they are drawn
+    if self.store is not None and len(self.stored):
+      self.local[self.stored] = self.store.local[self.slots[self.stored]]
+    for k, (i, trf) in enumerate(self.others):
+      if self.versions[k] != trf.GetVersion():
+        self.local[i] = np.array(trf.GetMatrix(),dtype='float32')
+        self.versions[k] = trf.GetVersion()
+    world = self.buffers[1] if self.world is self.buffers[0] else self.buffers[0]
+    for d, idx in enumerate(self.levels):
+      if d == 0:
+        world[idx] = self.local[idx]
+        base = self.nodes[0].GetParent()
+        if base:
+          # the compiled root hangs from a node outside the list
+          world[0] = np.array(base.GetModelMatrix(),dtype='float32') @ self.local[0]
+      else:
+        world[idx] = np.matmul(world[self.parent[idx]],self.local[idx])
+    return world
+
+  def Sync (self, world):
+    # publish computed matrices to the nodes that changed
+    changed = np.nonzero(np.any(world != self.world,axis=(1,2)))[0]
+    self.world = world
+    # parents come first, so their stamps are final when children are keyed
+    for i in changed.tolist():
+      node = self.nodes[i]
+      parent = node.GetParent()
+      node.world = glm.mat4(world[i])
+      node.stamp += 1
+      node.key = (parent.stamp if parent else 0,node.GetTransformVersion())
+    return len(changed)
+
+  def GetWorldMatrices (self):
+    return self.world
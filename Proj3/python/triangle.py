@@ -1,21 +1,19 @@
 from OpenGL.GL import *
 from shape import Shape
+from bounds import Bounds
+from vertexlayout import VertexLayout, FLOAT
 import numpy as np
 import math
 
+TRIANGLE_LAYOUT = VertexLayout(((0,2,FLOAT),(3,2,FLOAT)))   # coord, texcoord
+
 class Triangle (Shape):
   def __init__ (self):
     coord = [[-1,0],[1,0],[0,1]]
     bcoord = np.array(coord,dtype='float32')
-    self.vao = glGenVertexArrays(1)
-    glBindVertexArray(self.vao)
-    id = glGenBuffers(1)
-    glBindBuffer(GL_ARRAY_BUFFER,id)
-    glBufferData(GL_ARRAY_BUFFER,bcoord.nbytes,bcoord,GL_STATIC_DRAW)
-    glVertexAttribPointer(0,2,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(0) 
-    glVertexAttribPointer(3,2,GL_FLOAT,GL_FALSE,0,None)
-    glEnableVertexAttribArray(3) 
+    self.bounds = Bounds(bcoord,2)
+    # coords also serve as texcoords
+    self.vao, self.buffers, itype = TRIANGLE_LAYOUT.Upload({0:bcoord,3:bcoord})
 
   def Draw (self, st):
     glBindVertexArray(self.vao)
@@ -0,0 +1,151 @@
+from OpenGL.GL import *
+import numpy as np
+import ctypes
+
+# attribute formats
+FLOAT = "float"        # 32-bit floats
+HALF = "half"          # 16-bit floats
+UNORM16 = "unorm16"    # unsigned shorts mapped to [0,1]
+SNORM10 = "snorm10"    # unit xyz in a GL_INT_2_10_10_10_REV word, w = 0
+
+# Describes how the attributes of a shape are stored in one interleaved
+# vertex buffer: (location, components, format) in buffer order. Shapes
+# pass their float attributes to Upload, which packs and uploads them.
+class VertexLayout:
+  def __init__ (self, attribs):
+    self.attribs = tuple(attribs)
+    self.offsets = []
+    offset = 0
+    for loc, n, fmt in self.attribs:
+      if fmt == SNORM10 and n > 3:
+        raise RuntimeError("Packed 2_10_10_10 attributes have at most 3 components")
+      self.offsets.append(offset)
+      offset += AttribSize(n,fmt)
+    self.stride = offset   # bytes per vertex
+
+  def GetStride (self):
+    return self.stride
+
+  def GetLocations (self):
+    return [loc for loc, n, fmt in self.attribs]
+
+  def GetComponents (self):
+    # (location, components) of the unpacked float vertex
+    return [(loc,n) for loc, n, fmt in self.attribs]
+
+  def GetComponentCount (self):
+    return sum(n for loc, n, fmt in self.attribs)
+
+  def GetColumn (self, loc):
+    # first float of attribute 'loc' within an unpacked vertex, or None
+    col = 0
+    for l, n, fmt in self.attribs:
+      if l == loc:
+        return col
+      col += n
+    return None
+
+  def Interleave (self, attribs):
+    # attribs: location -> flat or (n,k) array; missing ones are zero
+    nvert = len(np.asarray(attribs[0]).reshape(-1,self.attribs[0][1]))
+    data = np.zeros((nvert,self.GetComponentCount()),dtype='float32')
+    col = 0
+    for loc, n, fmt in self.attribs:
+      if attribs.get(loc) is not None:
+        data[:,col:col+n] = np.asarray(attribs[loc],dtype='float32').reshape(nvert,n)
+      col += n
+    return data
+
+  def Pack (self, data):
+    # (n, components) floats -> (n, stride) bytes in the buffer formats
+    data = np.asarray(data,dtype='float32')
+    out = np.zeros((len(data),self.stride),dtype='uint8')
+    col = 0
+    for (loc, n, fmt), offset in zip(self.attribs,self.offsets):
+      packed = PackAttrib(data[:,col:col+n],fmt)
+      size = packed.dtype.itemsize*packed.shape[1]
+      out[:,offset:offset+size] = packed.view('uint8').reshape(len(data),size)
+      col += n
+    return out
+
+  def BindAttributes (self):
+    # set up the attributes of the buffer bound to GL_ARRAY_BUFFER in the
+    # currently bound VAO
+    for (loc, n, fmt), offset in zip(self.attribs,self.offsets):
+      ptr = ctypes.c_void_p(offset)
+      if fmt == FLOAT:
+        glVertexAttribPointer(loc,n,GL_FLOAT,GL_FALSE,self.stride,ptr)
+      elif fmt == HALF:
+        glVertexAttribPointer(loc,n,GL_HALF_FLOAT,GL_FALSE,self.stride,ptr)
+      elif fmt == UNORM16:
+        glVertexAttribPointer(loc,n,GL_UNSIGNED_SHORT,GL_TRUE,self.stride,ptr)
+      else:
+        glVertexAttribPointer(loc,4,GL_INT_2_10_10_10_REV,GL_TRUE,self.stride,ptr)
+      glEnableVertexAttribArray(loc)
+
+  def Upload (self, attribs, indices=None):
+    # create a VAO with one interleaved vertex buffer and, if there are
+    # indices, an element buffer of the smallest type that fits them;
+    # returns (vao, buffers, index type or None)
+    data = self.Pack(self.Interleave(attribs))
+    vao = glGenVertexArrays(1)
+    glBindVertexArray(vao)
+    buffers = list(np.atleast_1d(glGenBuffers(2 if indices is not None else 1)))
+    glBindBuffer(GL_ARRAY_BUFFER,buffers[0])
+    glBufferData(GL_ARRAY_BUFFER,data.nbytes,data,GL_STATIC_DRAW)
+    self.BindAttributes()
+    itype = None
+    if indices is not None:
+      indices, itype = PackIndices(indices,len(data))
+      glBindBuffer(GL_ELEMENT_ARRAY_BUFFER,buffers[1])
+      glBufferData(GL_ELEMENT_ARRAY_BUFFER,indices.nbytes,indices,GL_STATIC_DRAW)
+    glBindVertexArray(0)
+    return vao, buffers, itype
+
+# bytes taken by an attribute, padded to 4
+def AttribSize (n, fmt):
+  if fmt == FLOAT:
+    return 4*n
+  if fmt in (HALF,UNORM16):
+    return (2*n+3)//4*4
+  if fmt == SNORM10:
+    return 4
+  raise RuntimeError("Unknown vertex format: " + str(fmt))
+
+# (n,k) floats -> (n,m) array of the format's storage type, padded to 4 bytes
+def PackAttrib (values, fmt):
+  n, k = values.shape
+  if fmt == FLOAT:
+    return np.ascontiguousarray(values)
+  if fmt == HALF:
+    if len(values) and np.abs(values).max() > 65504:
+      raise RuntimeError("half attributes must be in [-65504,65504]")
+    out = np.zeros((n,(k+1)//2*2),dtype='float16')
+    out[:,:k] = values
+    return out
+  if fmt == UNORM16:
+    if len(values) and (values.min() < 0 or values.max() > 1):
+      raise RuntimeError("unorm16 attributes must be in [0,1]")
+    out = np.zeros((n,(k+1)//2*2),dtype='uint16')
+    out[:,:k] = np.round(values*65535)
+    return out
+  # unit vectors, as signed 10-bit components at bits 0, 10 and 20
+  length = np.linalg.norm(values,axis=1,keepdims=True)
+  values = values / np.where(length > 0,length,1)
+  q = np.round(np.clip(values,-1,1)*511).astype('int32') & 0x3ff
+  word = np.zeros(n,dtype='uint32')
+  for i in range(k):
+    word |= q[:,i].astype('uint32') << (10*i)
+  return word.reshape(n,1)
+
+# indices as uint16 when every vertex can be addressed by one
+def PackIndices (indices, nvert):
+  if nvert <= 1<<16:
+    return np.asarray(indices,dtype='uint16').ravel(), GL_UNSIGNED_SHORT
+  return np.asarray(indices,dtype='uint32').ravel(), GL_UNSIGNED_INT
+
+# float position and texcoords, packed normal and tangent: 28 bytes
+# instead of 44; texcoords stay float since meshes may tile them freely
+STANDARD_LAYOUT = VertexLayout(((0,3,FLOAT),(1,3,SNORM10),(2,3,SNORM10),(3,2,FLOAT)))
+# same with 16-bit texcoords, for shapes whose texcoords are in [0,1]: 24 bytes
+UNIT_LAYOUT = VertexLayout(((0,3,FLOAT),(1,3,SNORM10),(2,3,SNORM10),(3,2,UNORM16)))
@@ -0,0 +1,51 @@
+#version 430
+
+in vec3 veye;
+in vec3 neye;
+flat in uint mid;
+
+layout(std140) uniform FrameBlock {
+  mat4 view;
+  mat4 proj;
+  vec4 lpos;  // light pos in eye space
+  vec4 lamb;
+  vec4 ldif;
+  vec4 lspe;
+};
+
+struct Mat {
+  vec4 amb;
+  vec4 dif;
+  vec4 spe;
+  vec4 param;   // x: shininess, y: opacity
+};
+
+layout(std430, binding = 2) readonly buffer MaterialBlock {
+  Mat materials[];
+};
+
+out vec4 fcolor;
+
+void main (void)
+{
+  Mat m = materials[mid];
+  vec3 n = normalize(neye);
+  vec3 v = normalize(-veye);
+
+  vec3 light;
+  if (lpos.w == 0) 
+    light = normalize(vec3(lpos));
+  else 
+    light = normalize(vec3(lpos) - veye);
+
+  float ndotl = max(0.0, dot(n, light));
+  vec4 color = m.amb * lamb + m.dif * ldif * ndotl; 
+
+  if (ndotl > 0) {
+    vec3 h = normalize(light + v);
+    float ndoth = max(0.0, dot(n, h));
+    color += m.spe * lspe * pow(ndoth, m.param.x); 
+  }
+  
+  fcolor = vec4(color.rgb, m.param.y);
+}
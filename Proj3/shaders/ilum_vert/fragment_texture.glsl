@@ -13,10 +13,14 @@ uniform sampler2D decal;
 uniform sampler2D normalMap; // optional normal map
 uniform bool useNormalMap = false;
 
-uniform vec4 lpos;  // light pos in eye space
-uniform vec4 lamb;
-uniform vec4 ldif;
-uniform vec4 lspe;
+layout(std140) uniform FrameBlock {
+  mat4 view;
+  mat4 proj;
+  vec4 lpos;  // light pos in eye space
+  vec4 lamb;
+  vec4 ldif;
+  vec4 lspe;
+};
 
 uniform vec4 mamb;
 uniform vec4 mdif;
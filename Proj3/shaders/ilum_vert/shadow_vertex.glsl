@@ -2,9 +2,18 @@
 
 layout(location = 0) in vec3 aPos;
 
-uniform mat4 Mvp;
+layout(std140) uniform FrameBlock {
+    mat4 view;
+    mat4 proj;
+    vec4 lpos;
+    vec4 lamb;
+    vec4 ldif;
+    vec4 lspe;
+};
+
+uniform mat4 M;   // model matrix (already projected onto the shadow plane)
 
 void main()
 {
-    gl_Position = Mvp * vec4(aPos, 1.0);
+    gl_Position = proj * view * M * vec4(aPos, 1.0);
 }
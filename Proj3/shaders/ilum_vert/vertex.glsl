@@ -3,17 +3,25 @@
 layout(location = 0) in vec4 coord;
 layout(location = 1) in vec3 normal;
 
-uniform mat4 Mv; 
-uniform mat4 Mn; 
-uniform mat4 Mvp;
+layout(std140) uniform FrameBlock {
+  mat4 view;
+  mat4 proj;
+  vec4 lpos;  // light pos in eye space
+  vec4 lamb;
+  vec4 ldif;
+  vec4 lspe;
+};
+
+uniform mat4 M;   // model matrix, the only per-draw matrix
 
 out vec3 veye;
 out vec3 neye;
 
 void main (void) 
 {
+  mat4 Mv = view * M;
   veye = vec3(Mv * coord);
   // Pass unnormalized normal; normalize per-fragment for better accuracy
-  neye = vec3(Mn * vec4(normal, 0.0f));
-  gl_Position = Mvp*coord; 
+  neye = transpose(inverse(mat3(Mv))) * normal;
+  gl_Position = proj * Mv * coord; 
 }
\ No newline at end of file
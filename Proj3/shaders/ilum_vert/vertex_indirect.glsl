@@ -0,0 +1,36 @@
+#version 430
+
+layout(location = 0) in vec4 coord;
+layout(location = 1) in vec3 normal;
+layout(location = 9) in uint drawid;   // per-instance, set by the base instance
+
+layout(std140) uniform FrameBlock {
+  mat4 view;
+  mat4 proj;
+  vec4 lpos;  // light pos in eye space
+  vec4 lamb;
+  vec4 ldif;
+  vec4 lspe;
+};
+
+struct Draw {
+  mat4 model;
+  uvec4 material;   // x: index into the material buffer
+};
+
+layout(std430, binding = 1) readonly buffer DrawBlock {
+  Draw draws[];
+};
+
+out vec3 veye;
+out vec3 neye;
+flat out uint mid;
+
+void main (void) 
+{
+  mat4 Mv = view * draws[drawid].model;
+  veye = vec3(Mv * coord);
+  neye = transpose(inverse(mat3(Mv))) * normal;
+  mid = draws[drawid].material.x;
+  gl_Position = proj * Mv * coord; 
+}
@@ -0,0 +1,28 @@
+#version 410
+
+layout(location = 0) in vec4 coord;
+layout(location = 1) in vec3 normal;
+layout(location = 4) in mat4 Minst;   // per-instance model matrix
+layout(location = 8) in vec4 Icolor;  // per-instance material color
+
+layout(std140) uniform FrameBlock {
+  mat4 view;
+  mat4 proj;
+  vec4 lpos;  // light pos in eye space
+  vec4 lamb;
+  vec4 ldif;
+  vec4 lspe;
+};
+
+out vec3 veye;
+out vec3 neye;
+out vec4 icolor;
+
+void main (void) 
+{
+  mat4 Mv = view * Minst;
+  veye = vec3(Mv * coord);
+  neye = transpose(inverse(mat3(Mv))) * normal;
+  icolor = Icolor;
+  gl_Position = proj * Mv * coord; 
+}
@@ -5,9 +5,16 @@ layout(location = 1) in vec3 normal;
 layout(location = 2) in vec3 tangent; // tangent for normal mapping
 layout(location = 3) in vec2 texcoord;
 
-uniform mat4 Mv; 
-uniform mat4 Mn; 
-uniform mat4 Mvp;
+layout(std140) uniform FrameBlock {
+  mat4 view;
+  mat4 proj;
+  vec4 lpos;  // light pos in eye space
+  vec4 lamb;
+  vec4 ldif;
+  vec4 lspe;
+};
+
+uniform mat4 M;   // model matrix, the only per-draw matrix
 
 out data {
   vec3 veye;
@@ -18,9 +25,11 @@ out data {
 
 void main (void) 
 {
+  mat4 Mv = view * M;
+  mat3 Mn = transpose(inverse(mat3(Mv)));
   v.veye = vec3(Mv * coord);
-  v.neye = vec3(Mn * vec4(normal, 0.0f)); // normalize per-fragment
-  v.teye = vec3(Mn * vec4(tangent, 0.0f));
+  v.neye = Mn * normal; // normalize per-fragment
+  v.teye = Mn * tangent;
   v.texcoord = texcoord;
-  gl_Position = Mvp * coord; 
+  gl_Position = proj * Mv * coord; 
 }
@@ -0,0 +1,8 @@
+#version 410
+
+out vec4 fcolor;
+
+void main (void)
+{
+  fcolor = vec4(1.0); // color writes are masked during occlusion queries
+}
@@ -4,6 +4,10 @@ import numpy as np
 
 class Cube (Shape):
   def __init__ (self):
+    # all cubes share their buffers
+    self.Share((Cube,),self.Build)
+
+  def Build (self):
     coords = np.array([
       # back face: counter clockwise 
       -0.5, 0.0,-0.5,
@@ -145,6 +149,7 @@ class Cube (Shape):
     glBindVertexArray(self.vao)
     # create coord buffer
     ids = glGenBuffers(5)
+    self.buffers = ids
     glBindBuffer(GL_ARRAY_BUFFER,ids[0])
     glBufferData(GL_ARRAY_BUFFER,coords.nbytes,coords,GL_STATIC_DRAW)
     glVertexAttribPointer(0,3,GL_FLOAT,GL_FALSE,0,None)
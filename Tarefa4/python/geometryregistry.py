@@ -0,0 +1,41 @@
+# Shares the buffers of procedural shapes: shapes created with the same
+# class and parameters (including the arena) adopt the VAO and buffers, or
+# the arena range, built by the first of them. Each shape holds one
+# reference; the buffers are deleted when the last one is released.
+class GeometryRegistry:
+  def __init__ (self):
+    self.entries = {}   # key -> [shared attributes, delete function, references]
+    self.stats = {"uploads": 0, "shared": 0}
+
+  def Acquire (self, key, build, delete):
+    # 'build' creates the buffers and returns the attributes to share;
+    # 'delete' receives them back when the last reference goes away
+    entry = self.entries.get(key)
+    if entry is None:
+      entry = [build(),delete,0]
+      self.entries[key] = entry
+      self.stats["uploads"] += 1
+    else:
+      self.stats["shared"] += 1
+    entry[2] += 1
+    return entry[0]
+
+  def Release (self, key):
+    entry = self.entries[key]
+    entry[2] -= 1
+    if entry[2] == 0:
+      del self.entries[key]
+      attrs, delete, refs = entry
+      delete(attrs)
+
+  def GetReferences (self, key):
+    entry = self.entries.get(key)
+    return entry[2] if entry else 0
+
+  def GetStats (self):
+    stats = dict(self.stats)
+    stats["geometries"] = len(self.entries)
+    stats["references"] = sum(entry[2] for entry in self.entries.values())
+    return stats
+
+registry = GeometryRegistry()
@@ -6,6 +6,10 @@ import math
 
 class Cylinder(Shape):
   def __init__(self, nstack=32, nslice=32):
+    # cilindros com a mesma tesselagem compartilham os buffers
+    self.Share((Cylinder,nstack,nslice),lambda: self.Build(nstack,nslice))
+
+  def Build(self, nstack, nslice):
     # nstack: número de divisões ao longo da altura (eixo Y)
     # nslice: número de divisões ao redor do círculo
     
@@ -53,6 +57,7 @@ class Cylinder(Shape):
     
     # create buffers
     id = glGenBuffers(5)
+    self.buffers = id
     
     # Coordenadas de vértices
     glBindBuffer(GL_ARRAY_BUFFER,id[0])